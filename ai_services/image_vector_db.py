@@ -5,77 +5,142 @@ import os
 from transformers import CLIPProcessor, CLIPModel
 import torch
 import logging
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
 class ImageVectorDB:
-    def __init__(self, db_path="data/image_vectors.npz"):
+    def __init__(self, db_path="data/image_vectors.npz", device="cpu"):
         self.db_path = Path(db_path)
-        self.embeddings = []
+        self.device = device
+        # (n_images, dim) matrix, one L2-normalized row per image
+        self.embeddings = np.empty((0, 0), dtype=np.float32)
         self.image_paths = []
         self._load()
-        self.clip_model = CLIPModel.from_pretrained("openai/clip-vit-base-patch16")
+        self.clip_model = CLIPModel.from_pretrained("openai/clip-vit-base-patch16").to(self.device)
+        self.clip_model.eval()
         self.clip_processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch16")
 
     def _load(self):
         if self.db_path.exists():
             try:
                 data = np.load(self.db_path, allow_pickle=True)
-                self.embeddings = list(data["embeddings"])
+                # Stored as float16 on disk; search in float32
+                self.embeddings = data["embeddings"].astype(np.float32)
                 self.image_paths = list(data["image_paths"])
-                logger.info(f"Loaded vector database with {len(self.image_paths)} images from {self.db_path}")
+                logger.info("Loaded vector database with %d images from %s", len(self.image_paths), self.db_path)
             except Exception as e:
-                logger.error(f"Error loading vector database: {e}")
-                self.embeddings = []
+                logger.error("Error loading vector database: %s", e)
+                self.embeddings = np.empty((0, 0), dtype=np.float32)
                 self.image_paths = []
         else:
-            logger.warning(f"Vector database file {self.db_path} does not exist")
-            self.embeddings = []
+            logger.warning("Vector database file %s does not exist", self.db_path)
+            self.embeddings = np.empty((0, 0), dtype=np.float32)
             self.image_paths = []
 
     def _save(self):
         try:
-            np.savez(self.db_path, embeddings=np.array(self.embeddings), image_paths=np.array(self.image_paths))
-            logger.info(f"Saved vector database with {len(self.image_paths)} images to {self.db_path}")
+            np.savez(
+                self.db_path,
+                embeddings=np.asarray(self.embeddings, dtype=np.float16),
+                image_paths=np.array(self.image_paths)
+            )
+            logger.info("Saved vector database with %d images to %s", len(self.image_paths), self.db_path)
         except Exception as e:
-            logger.error(f"Error saving vector database: {e}")
+            logger.error("Error saving vector database: %s", e)
+
+    def _autocast(self):
+        """Half-precision autocast on CUDA; full precision elsewhere"""
+        if str(self.device).startswith("cuda"):
+            return torch.autocast(device_type="cuda", dtype=torch.float16)
+        return nullcontext()
 
     def get_image_embedding(self, image_path):
         try:
             image = Image.open(image_path).convert("RGB")
-            inputs = self.clip_processor(images=image, return_tensors="pt")
-            with torch.no_grad():
+            inputs = self.clip_processor(images=image, return_tensors="pt").to(self.device)
+            with torch.no_grad(), self._autocast():
                 embedding = self.clip_model.get_image_features(**inputs)
-            embedding = embedding.cpu().numpy().flatten()
+            embedding = embedding.float().cpu().numpy().flatten()
             # Normalize for cosine similarity
             embedding = embedding / np.linalg.norm(embedding)
             return embedding
         except Exception as e:
-            logger.error(f"Error getting image embedding for {image_path}: {e}")
+            logger.error("Error getting image embedding for %s: %s", image_path, e)
             raise
 
+    def get_image_embeddings_batch(self, image_paths):
+        """
+        Embed several images in a single forward pass.
+        
+        Args:
+            image_paths: List of image paths
+            
+        Returns:
+            Array of shape (len(image_paths), dim) with L2-normalized rows
+        """
+        # Decode on a few threads; PIL releases the GIL while decoding
+        with ThreadPoolExecutor(max_workers=min(8, len(image_paths) or 1)) as pool:
+            images = list(pool.map(lambda path: Image.open(path).convert("RGB"), image_paths))
+        inputs = self.clip_processor(images=images, return_tensors="pt")
+        return self.embed_pixel_values(inputs["pixel_values"])
+
+    def embed_pixel_values(self, pixel_values):
+        """
+        Embed a batch of images already preprocessed by clip_processor.
+        
+        Args:
+            pixel_values: Tensor of shape (batch, 3, H, W)
+            
+        Returns:
+            Array of shape (batch, dim) with L2-normalized rows
+        """
+        pixel_values = pixel_values.to(self.device, non_blocking=True)
+        with torch.inference_mode(), self._autocast():
+            embeddings = self.clip_model.get_image_features(pixel_values=pixel_values)
+        embeddings = embeddings.float().cpu().numpy()
+        # Normalize for cosine similarity
+        return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
     def add_image(self, image_path):
         try:
             embedding = self.get_image_embedding(image_path)
-            self.embeddings.append(embedding)
+            if len(self.embeddings) == 0:
+                self.embeddings = embedding[np.newaxis, :].astype(np.float32)
+            else:
+                self.embeddings = np.vstack([self.embeddings, embedding])
             self.image_paths.append(str(image_path))
             self._save()
             return True
         except Exception as e:
-            logger.error(f"Error adding image {image_path} to vector database: {e}")
+            logger.error("Error adding image %s to vector database: %s", image_path, e)
             return False
 
     def search(self, image_path, threshold=0.8):
-        if not self.embeddings:
+        if len(self.embeddings) == 0:
             return None, 0.0
         query_emb = self.get_image_embedding(image_path)
-        similarities = np.dot(np.stack(self.embeddings), query_emb)
+        similarities = np.dot(self.embeddings, query_emb)
         idx = np.argmax(similarities)
         max_sim = similarities[idx]
         if max_sim >= threshold:
             return self.image_paths[idx], max_sim
         return None, max_sim
 
+    def _top_k_results(self, similarities, k, threshold):
+        """Select the k best matches above threshold, highest similarity first"""
+        k = min(k, len(similarities))
+        # Partial selection is O(N); only the k winners get sorted
+        top_indices = np.argpartition(-similarities, k - 1)[:k]
+        top_indices = top_indices[np.argsort(-similarities[top_indices])]
+        return [
+            # Normalize the path to use consistent directory separators
+            (os.path.normpath(self.image_paths[idx]), similarities[idx])
+            for idx in top_indices
+            if similarities[idx] >= threshold
+        ]
+
     def search_top_k(self, image_path, k=5, threshold=0.9):
         """
         Search for the top-k most similar images to the given image.
@@ -88,39 +153,60 @@ class ImageVectorDB:
         Returns:
             List of (image_path, similarity_score) tuples, sorted by similarity (highest first)
         """
-        if not self.embeddings or k <= 0:
+        if len(self.embeddings) == 0 or k <= 0:
             logger.warning("No embeddings in database or invalid k value")
             return []
             
         try:
             # Get embedding for query image
             query_emb = self.get_image_embedding(image_path)
-            
-            # Calculate similarity with all embeddings
-            similarities = np.dot(np.stack(self.embeddings), query_emb)
-            
-            # Get indices of top-k results
-            top_indices = np.argsort(similarities)[::-1][:k*2]  # Get more results than needed for filtering
-            
-            # Return top-k paths and scores, filtered by threshold
-            results = []
-            for idx in top_indices:
-                sim_score = similarities[idx]
-                if sim_score >= threshold:
-                    # Normalize the path to use consistent directory separators
-                    path = self.image_paths[idx]
-                    # Ensure the path uses consistent format
-                    norm_path = os.path.normpath(path)
-                    results.append((norm_path, sim_score))
-            
-            # Sort by similarity (highest first) and take top k
-            results = sorted(results, key=lambda x: x[1], reverse=True)[:k]
-            
-            logger.info(f"Found {len(results)} similar images with scores >= {threshold}")
-            return results
+            return self.search_top_k_by_embedding(query_emb, k=k, threshold=threshold)
         except Exception as e:
-            logger.error(f"Error searching for similar images: {e}")
+            logger.error("Error searching for similar images: %s", e)
             return []
+
+    def search_top_k_by_embedding(self, query_emb, k=5, threshold=0.9):
+        """
+        Search for the top-k most similar images to an already computed embedding.
+        
+        Args:
+            query_emb: L2-normalized query embedding
+            k: Number of top results to return (default: 5)
+            threshold: Minimum similarity score to include in results (default: 0.9)
+            
+        Returns:
+            List of (image_path, similarity_score) tuples, sorted by similarity (highest first)
+        """
+        if len(self.embeddings) == 0 or k <= 0:
+            logger.warning("No embeddings in database or invalid k value")
+            return []
+        
+        # Calculate similarity with all embeddings
+        similarities = np.dot(self.embeddings, query_emb)
+        results = self._top_k_results(similarities, k, threshold)
+        
+        logger.info("Found %d similar images with scores >= %s", len(results), threshold)
+        return results
+    
+    def search_top_k_batch(self, query_embs, k=5, threshold=0.9):
+        """
+        Search for the top-k most similar images for several embeddings at once.
+        
+        Args:
+            query_embs: Array of shape (batch, dim) with L2-normalized rows
+            k: Number of top results to return per query (default: 5)
+            threshold: Minimum similarity score to include in results (default: 0.9)
+            
+        Returns:
+            One list of (image_path, similarity_score) tuples per query row
+        """
+        if len(self.embeddings) == 0 or k <= 0:
+            logger.warning("No embeddings in database or invalid k value")
+            return [[] for _ in range(len(query_embs))]
+        
+        # One matrix product scores every query against every template
+        similarities = np.dot(np.asarray(query_embs, dtype=np.float32), self.embeddings.T)
+        return [self._top_k_results(row, k, threshold) for row in similarities]
     
     def get_database_stats(self):
         """
@@ -16,6 +16,7 @@ import json
 import yaml
 from dotenv import load_dotenv
 import time
+import uuid
 
 # Load environment variables
 load_dotenv()
@@ -585,7 +586,8 @@ class MemeService:
         if output_path is None:
             data_dir = Path(__file__).parent.parent / "data" / "generated_memes"
             data_dir.mkdir(parents=True, exist_ok=True)
-            output_filename = f"whitebox_{os.path.basename(image_path)}"
+            # Templates are shared between requests, so the name needs its own suffix
+            output_filename = f"whitebox_{uuid.uuid4().hex}_{os.path.basename(image_path)}"
             output_path = str(data_dir / output_filename)
         image.save(output_path)
         return output_path
@@ -1079,7 +1081,7 @@ class MemeService:
             # Save the result
             if not output_path:
                 timestamp = int(time.time())
-                output_filename = f"meme_with_bboxes_{timestamp}.jpg"
+                output_filename = f"meme_with_bboxes_{timestamp}_{uuid.uuid4().hex}.jpg"
                 output_path = str(self.generated_memes_dir / output_filename)
             
             meme_image.save(output_path, 'JPEG', quality=95)
@@ -7,7 +7,9 @@ from flask import request, jsonify, send_file, session
 from werkzeug.utils import secure_filename
 import os
 import time
+import uuid
 import shutil
+import threading
 from pathlib import Path
 import yaml
 import sys
@@ -26,23 +28,29 @@ logger = logging.getLogger(__name__)
 # Global service instances - initialized once at startup
 _meme_service = None
 _vector_db = None
+# Guards lazy initialization when requests are served from multiple threads
+_init_lock = threading.Lock()
 
 def get_meme_service():
     """Get the global MemeService instance, initializing if needed."""
     global _meme_service
     if _meme_service is None:
-        logger.info("Initializing MemeService (this may take a moment on first load)...")
-        _meme_service = MemeService()
-        logger.info("MemeService initialized successfully")
+        with _init_lock:
+            if _meme_service is None:
+                logger.info("Initializing MemeService (this may take a moment on first load)...")
+                _meme_service = MemeService()
+                logger.info("MemeService initialized successfully")
     return _meme_service
 
 def get_vector_db():
     """Get the global ImageVectorDB instance, initializing if needed."""
     global _vector_db
     if _vector_db is None:
-        logger.info("Initializing ImageVectorDB (this may take a moment on first load)...")
-        _vector_db = ImageVectorDB()
-        logger.info("ImageVectorDB initialized successfully")
+        with _init_lock:
+            if _vector_db is None:
+                logger.info("Initializing ImageVectorDB (this may take a moment on first load)...")
+                _vector_db = ImageVectorDB()
+                logger.info("ImageVectorDB initialized successfully")
     return _vector_db
 
 def warmup_models():
@@ -50,8 +58,10 @@ def warmup_models():
     try:
         logger.info("Starting model warmup...")
         
-        # Initialize MemeService (loads OCR models)
+        # Initialize MemeService and its OCR reader (the reader is otherwise
+        # built lazily on the first text-removal request)
         meme_service = get_meme_service()
+        meme_service.ocr_reader
         logger.info("MemeService initialized")
         
         # Initialize ImageVectorDB (loads CLIP model and vector database)
@@ -90,6 +100,8 @@ def configure_routes(app):
     @app.route('/api/generate', methods=['POST'])
     def generate_meme():
         """Generate a meme from uploaded image."""
+        # The query image is removed once the response has been produced
+        to_cleanup = []
         try:
             # Check if request contains an image file or URL
             image_path = None
@@ -104,12 +116,13 @@ def configure_routes(app):
                 save_dir = Path(__file__).parent.parent / "data" / "user_query_meme"
                 save_dir.mkdir(parents=True, exist_ok=True)
                 
-                # Generate timestamp filename
-                timestamp = str(int(time.time()))
+                # Generate a per-request filename; concurrent requests may share a second
+                timestamp = f"{int(time.time())}_{uuid.uuid4().hex}"
                 filename = secure_filename(file.filename)
                 save_path = save_dir / f"{timestamp}_{filename}"
                 
                 # Save the uploaded file
+                to_cleanup.append(save_path)
                 file.save(save_path)
                 image_path = str(save_path)
                 
@@ -121,6 +134,7 @@ def configure_routes(app):
                 
                 # Download image from URL to user_query_meme directory
                 image_path = download_image_from_url(image_url)
+                to_cleanup.append(image_path)
             
             else:
                 return jsonify({'error': 'No image or image URL provided'}), 400
@@ -136,42 +150,23 @@ def configure_routes(app):
             response_dir = Path(__file__).parent.parent / "data" / "user_response_meme"
             response_dir.mkdir(parents=True, exist_ok=True)
             
-            # Copy the generated meme to user_response_meme directory
+            # Move the generated meme to user_response_meme directory
             output_filename = f"response_{os.path.basename(image_path)}"
             output_path = str(response_dir / output_filename)
             
-            # Copy the file
-            shutil.copy2(temp_output, output_path)
+            # Move rather than copy so only the final meme is kept on disk
+            shutil.move(temp_output, output_path)
             
             logger.info(f"Saved meme response to {output_path}")
             
-            # Post Twitter notification asynchronously (non-blocking)
-            try:
-                import threading
-                original_caption = caption if caption else "custom meme"
-                
-                def post_twitter_async():
-                    try:
-                        twitter_success = notify_meme_generated(
-                            input_text=original_caption,
-                            meme_image_path=output_path,
-                            from_template=False,
-                            similarity_score=0
-                        )
-                        if twitter_success:
-                            logger.info("✅ Successfully posted promotional tweet about generated meme")
-                        else:
-                            logger.info("ℹ️ Twitter notification was not posted (disabled or failed)")
-                    except Exception as twitter_error:
-                        logger.error(f"Error posting Twitter notification: {twitter_error}")
-                
-                # Start Twitter posting in background thread
-                twitter_thread = threading.Thread(target=post_twitter_async, daemon=True)
-                twitter_thread.start()
-                logger.info("🚀 Started Twitter notification in background")
-                
-            except Exception as e:
-                logger.error(f"Error starting Twitter notification thread: {e}")
+            # Post Twitter notification in the background (non-blocking)
+            notify_meme_generated(
+                input_text=caption if caption else "custom meme",
+                meme_image_path=output_path,
+                from_template=False,
+                similarity_score=0
+            )
+            logger.info("🚀 Queued Twitter notification in background")
             
             # Return the generated meme
             return send_file(
@@ -184,10 +179,15 @@ def configure_routes(app):
         except Exception as e:
             logger.error(f"Error generating meme: {e}")
             return jsonify({'error': str(e)}), 500
+        finally:
+            for path in to_cleanup:
+                Path(path).unlink(missing_ok=True)
     
     @app.route('/api/smart_generate', methods=['POST'])
     def smart_generate_meme():
         """API endpoint for meme generation with similarity search and white box logic."""
+        # Intermediate files removed once the response has been produced
+        to_cleanup = []
         try:
             image_url = request.form.get('image_url')
             caption = request.form.get('caption', '')
@@ -223,8 +223,9 @@ def configure_routes(app):
             for directory in [user_query_dir, cleaned_image_dir, meme_templates_dir, response_dir]:
                 directory.mkdir(parents=True, exist_ok=True)
             
-            # Generate timestamp for unique filenames
-            timestamp = str(int(time.time()))
+            # Generate a per-request prefix for unique filenames; threaded workers
+            # can serve several requests within the same second
+            timestamp = f"{int(time.time())}_{uuid.uuid4().hex}"
             
             # Download image locally if needed
             if image_url:
@@ -234,6 +235,7 @@ def configure_routes(app):
                     # Save to user_query_meme with timestamp
                     filename = f"{timestamp}_url_image.jpg"
                     local_image_path = str(user_query_dir / filename)
+                    to_cleanup.append(local_image_path)
                     with open(local_image_path, 'wb') as f:
                         for chunk in resp.iter_content(1024):
                             f.write(chunk)
@@ -244,6 +246,7 @@ def configure_routes(app):
                 file = request.files['image']
                 filename = secure_filename(file.filename)
                 local_image_path = str(user_query_dir / f"{timestamp}_{filename}")
+                to_cleanup.append(local_image_path)
                 file.save(local_image_path)
             else:
                 return jsonify({'error': 'No image provided'}), 400
@@ -264,6 +267,7 @@ def configure_routes(app):
                 min_confidence=0.5,
                 output_path=cleaned_image_path
             )
+            to_cleanup.append(cleaned_image_path)
             logger.info(f"Text cleaned, saved to: {cleaned_image_path}")
             
             # Log the top 5 most similar images
@@ -477,12 +481,12 @@ def configure_routes(app):
             # Get the similarity score
             similarity_score = float(similarity * 100) if from_template else 0  # Convert to percentage
             
-            # Copy the generated meme to user_response_meme directory
+            # Move the generated meme to user_response_meme directory
             output_filename = f"response_{os.path.basename(local_image_path)}"
             output_path = str(response_dir / output_filename)
             
-            # Copy the file
-            shutil.copy2(meme_path, output_path)
+            # Move rather than copy so only the final meme is kept on disk
+            shutil.move(meme_path, output_path)
             
             logger.info(f"Saved meme response to {output_path}")
             
@@ -495,33 +499,14 @@ def configure_routes(app):
                 # Print debug info
                 print(f"DEBUG - Returning template info in JSON response: from_template={from_template}, similarity_score={similarity_score}")
                 
-                # Post Twitter notification asynchronously (non-blocking)
-                try:
-                    import threading
-                    original_caption = caption if caption else "custom meme"
-                    
-                    def post_twitter_async():
-                        try:
-                            twitter_success = notify_meme_generated(
-                                input_text=original_caption,
-                                meme_image_path=output_path,
-                                from_template=from_template,
-                                similarity_score=similarity_score
-                            )
-                            if twitter_success:
-                                logger.info("✅ Successfully posted promotional tweet about generated meme")
-                            else:
-                                logger.info("ℹ️ Twitter notification was not posted (disabled or failed)")
-                        except Exception as twitter_error:
-                            logger.error(f"Error posting Twitter notification: {twitter_error}")
-                    
-                    # Start Twitter posting in background thread
-                    twitter_thread = threading.Thread(target=post_twitter_async, daemon=True)
-                    twitter_thread.start()
-                    logger.info("🚀 Started Twitter notification in background")
-                    
-                except Exception as e:
-                    logger.error(f"Error starting Twitter notification thread: {e}")
+                # Post Twitter notification in the background (non-blocking)
+                notify_meme_generated(
+                    input_text=caption if caption else "custom meme",
+                    meme_image_path=output_path,
+                    from_template=from_template,
+                    similarity_score=similarity_score
+                )
+                logger.info("🚀 Queued Twitter notification in background")
                 
                 return jsonify({
                     'meme_url': meme_url, 
@@ -529,33 +514,14 @@ def configure_routes(app):
                     'similarity_score': similarity_score
                 })
             
-            # For file download requests, also post Twitter notification asynchronously
-            try:
-                import threading
-                original_caption = caption if caption else "custom meme"
-                
-                def post_twitter_async():
-                    try:
-                        twitter_success = notify_meme_generated(
-                            input_text=original_caption,
-                            meme_image_path=output_path,
-                            from_template=from_template,
-                            similarity_score=similarity_score
-                        )
-                        if twitter_success:
-                            logger.info("✅ Successfully posted promotional tweet about generated meme")
-                        else:
-                            logger.info("ℹ️ Twitter notification was not posted (disabled or failed)")
-                    except Exception as twitter_error:
-                        logger.error(f"Error posting Twitter notification: {twitter_error}")
-                
-                # Start Twitter posting in background thread
-                twitter_thread = threading.Thread(target=post_twitter_async, daemon=True)
-                twitter_thread.start()
-                logger.info("🚀 Started Twitter notification in background")
-                
-            except Exception as e:
-                logger.error(f"Error starting Twitter notification thread: {e}")
+            # For file download requests, also post Twitter notification in the background
+            notify_meme_generated(
+                input_text=caption if caption else "custom meme",
+                meme_image_path=output_path,
+                from_template=from_template,
+                similarity_score=similarity_score
+            )
+            logger.info("🚀 Queued Twitter notification in background")
             
             # Otherwise return the file directly
             return send_file(
@@ -567,4 +533,7 @@ def configure_routes(app):
         except Exception as e:
             logger.error(f"Error generating smart meme: {e}", exc_info=True)
             return jsonify({'error': f'Error generating meme: {str(e)}'}), 500
+        finally:
+            for path in to_cleanup:
+                Path(path).unlink(missing_ok=True)
    
\ No newline at end of file
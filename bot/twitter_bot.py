@@ -6,30 +6,64 @@ Anyone can mention @memezap with an image to generate memes
 
 import tweepy
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 import time
+import random
+import hashlib
+import threading
 import logging
+import logging.handlers
+import queue
+import atexit
+import re
 from PIL import Image
 from io import BytesIO
 import textwrap
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from pathlib import Path
 import json
+import sqlite3
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Configure logging
+# Configure logging - callers only enqueue records; a listener thread does the file/console I/O
+log_queue = queue.Queue(-1)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('meme_bot.log'),
-        logging.StreamHandler()
-    ]
+    handlers=[logging.handlers.QueueHandler(log_queue)]
 )
+log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+log_handlers = [logging.FileHandler('meme_bot.log'), logging.StreamHandler()]
+for handler in log_handlers:
+    handler.setFormatter(log_formatter)
+log_listener = logging.handlers.QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
 logger = logging.getLogger(__name__)
 
+# Matches @mentions and links as whole whitespace-delimited words
+_STRIP_RE = re.compile(r'(?<!\S)(?:@|http)\S*')
+_WS_RE = re.compile(r'\s+')
+
+class MentionStream(tweepy.StreamingClient):
+    """Filtered stream that hands each pushed mention to the bot"""
+    
+    def __init__(self, bot):
+        super().__init__(bot.bearer_token, wait_on_rate_limit=True)
+        self.bot = bot
+    
+    def on_tweet(self, tweet):
+        self.bot.handle_streamed_mention(tweet.id)
+    
+    def on_errors(self, errors):
+        logger.error("Stream error: %s", errors)
+
 class MemeZapBot:
     def __init__(self):
         """Initialize the MemeZap bot"""
@@ -47,25 +81,67 @@ class MemeZapBot:
                    self.access_token_secret, self.bearer_token]):
             raise ValueError("Missing Twitter API credentials in environment variables")
         
+        # Pooled HTTP session so repeated API calls reuse the TCP/TLS connection
+        self.http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(total=3, backoff_factor=0.3)
+        )
+        self.http.mount('https://', adapter)
+        self.http.mount('http://', adapter)
+        
         # Initialize Twitter API clients
         self.setup_twitter_clients()
         
         # Track processed tweets to avoid duplicates
-        self.processed_tweets = set()
-        self.load_processed_tweets()
+        self.max_processed_tweets = 1000
+        self.open_state_db()
+        
+        # Newest mention seen so far; only mentions after it are fetched
+        self.since_id = self.load_since_id()
+        
+        # Streamed mentions queued but not yet finished
+        self.streamed_in_flight = set()
+        self.streamed_lock = threading.Lock()
+        
+        # Generated memes keyed by input image + text, reused for repeat requests;
+        # least recently used files are evicted once the directory passes its size cap
+        self.meme_cache_dir = Path(__file__).parent.parent / "data" / "bot_meme_cache"
+        self.meme_cache_dir.mkdir(parents=True, exist_ok=True)
+        self.meme_cache_max_bytes = int(os.getenv('BOT_MEME_CACHE_MAX_MB', 200)) * 1024 * 1024
+        self.meme_cache_lock = threading.Lock()
         
         # Bot configuration
         self.trigger_phrases = ["meme", "make meme", "meme this", "generate meme"]
         self.max_text_length = 200
+        self.max_image_bytes = 10 * 1024 * 1024
+        
+        # Mentions are handled concurrently, bounded so the MemeZap API isn't flooded
+        self.max_workers = max(1, int(os.getenv('BOT_MAX_WORKERS', 5)))
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='meme-request')
+        
+        # Per-user limit so one account can't monopolize the MemeZap API
+        self.max_memes_per_user = int(os.getenv('BOT_MAX_MEMES_PER_HOUR', 5))
+        self.user_window = 3600
+        self.user_requests = {}
+        self.user_requests_lock = threading.Lock()
         
         # Get bot's user info
         self.bot_user_id = None
         self.bot_username = None
         self.get_bot_info()
+        self.compile_text_patterns()
         
         # Rate limiting
         self.last_check_time = None
-        self.check_interval = 180  # 3 minutes between checks
+        self.check_interval = int(os.getenv('BOT_CHECK_INTERVAL', 180))  # 3 minutes between checks by default
+        if self.check_interval < 15:
+            logger.warning("BOT_CHECK_INTERVAL=%ds is below the 15s minimum, using 15s", self.check_interval)
+            self.check_interval = 15
+        self.max_backoff = 900  # Cap error backoff at 15 minutes
+        self.consecutive_errors = 0
+        self.rate_limit_reset = None
     
     def setup_twitter_clients(self):
         """Setup Twitter API clients"""
@@ -85,46 +161,85 @@ class MemeZapBot:
                 wait_on_rate_limit=False
             )
             
-            # Test authentication
-            me = self.api_v1.verify_credentials()
-            logger.info(f"🤖 MemeZap Bot authenticated as @{me.screen_name}")
+            # Test authentication; the result is reused by get_bot_info
+            self.me = self.api_v1.verify_credentials()
+            logger.info("🤖 MemeZap Bot authenticated as @%s", self.me.screen_name)
             
         except Exception as e:
-            logger.error(f"Failed to authenticate with Twitter API: {e}")
+            logger.error("Failed to authenticate with Twitter API: %s", e)
             raise
     
     def get_bot_info(self):
         """Get the bot's user info"""
         try:
-            me_v1 = self.api_v1.verify_credentials()
-            me_v2 = self.client.get_me()
-            
-            self.bot_user_id = me_v2.data.id
-            self.bot_username = me_v1.screen_name.lower()
+            # v1.1 and v2 share user IDs, so no separate get_me() call is needed
+            self.bot_user_id = self.me.id
+            self.bot_username = self.me.screen_name.lower()
             
-            logger.info(f"🎭 Bot Username: @{me_v1.screen_name}")
-            logger.info(f"📝 Anyone can mention @{me_v1.screen_name} to generate memes!")
+            logger.info("🎭 Bot Username: @%s", self.me.screen_name)
+            logger.info("📝 Anyone can mention @%s to generate memes!", self.me.screen_name)
             
         except Exception as e:
-            logger.error(f"Error getting bot info: {e}")
+            logger.error("Error getting bot info: %s", e)
+    
+    def open_state_db(self, path=Path(__file__).parent.parent / 'bot_state.db'):
+        """Open the SQLite store for processed tweet IDs and the mentions cursor"""
+        self.state_db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.state_db.execute('PRAGMA journal_mode=WAL')
+        self.state_db.execute('CREATE TABLE IF NOT EXISTS seen (id INTEGER PRIMARY KEY)')
+        self.state_db.execute('CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT)')
+        self.migrate_legacy_state()
     
-    def load_processed_tweets(self):
-        """Load previously processed tweet IDs"""
+    def migrate_legacy_state(self):
+        """One-time import of processed tweet IDs from the old processed_tweets.json"""
         try:
             if os.path.exists('processed_tweets.json'):
                 with open('processed_tweets.json', 'r') as f:
-                    self.processed_tweets = set(json.load(f))
+                    legacy_ids = json.load(f)
+                if legacy_ids:
+                    self.mark_processed(legacy_ids)
+                os.rename('processed_tweets.json', 'processed_tweets.json.migrated')
         except Exception as e:
-            logger.warning(f"Could not load processed tweets: {e}")
-            self.processed_tweets = set()
+            logger.warning("Could not migrate legacy bot state: %s", e)
     
-    def save_processed_tweets(self):
-        """Save processed tweet IDs"""
+    def is_processed(self, tweet_id):
+        """Check whether a tweet has already been handled"""
+        row = self.state_db.execute('SELECT 1 FROM seen WHERE id = ? LIMIT 1', (int(tweet_id),)).fetchone()
+        return row is not None
+    
+    def mark_processed(self, tweet_ids):
+        """Record processed tweet IDs, keeping only the most recent ones"""
+        try:
+            self.state_db.executemany(
+                'INSERT OR IGNORE INTO seen (id) VALUES (?)',
+                ((int(tweet_id),) for tweet_id in tweet_ids)
+            )
+            # Tweet IDs grow over time, so the largest IDs are the newest
+            self.state_db.execute(
+                'DELETE FROM seen WHERE id < (SELECT id FROM seen ORDER BY id DESC LIMIT 1 OFFSET ?)',
+                (self.max_processed_tweets - 1,)
+            )
+        except Exception as e:
+            logger.error("Could not save processed tweets: %s", e)
+    
+    def load_since_id(self):
+        """Load the mentions cursor saved by the previous run"""
         try:
-            with open('processed_tweets.json', 'w') as f:
-                json.dump(list(self.processed_tweets), f)
+            row = self.state_db.execute("SELECT value FROM state WHERE key = 'since_id'").fetchone()
+            return int(row[0]) if row else None
         except Exception as e:
-            logger.error(f"Could not save processed tweets: {e}")
+            logger.warning("Could not load since_id: %s", e)
+            return None
+    
+    def save_since_id(self, since_id):
+        """Persist the mentions cursor"""
+        try:
+            self.state_db.execute(
+                "INSERT OR REPLACE INTO state (key, value) VALUES ('since_id', ?)",
+                (str(since_id),)
+            )
+        except Exception as e:
+            logger.error("Could not save since_id: %s", e)
     
     def check_mentions(self):
         """Check for new mentions from ANY Twitter user"""
@@ -140,56 +255,117 @@ class MemeZapBot:
                 # Get mentions timeline - this gets ALL mentions of @memezap from ANY user
                 mentions = self.api_v1.mentions_timeline(
                     count=20,  # Check more mentions
+                    since_id=self.since_id,
                     include_entities=True,
                     tweet_mode='extended'
                 )
                 
+                # Successful poll - reset error backoff
+                self.consecutive_errors = 0
+                self.rate_limit_reset = None
+                
                 if not mentions:
                     logger.info("No new mentions found")
                     return
                 
-                logger.info(f"📬 Found {len(mentions)} mentions to process")
+                newest_id = max(self.since_id or 0, max(tweet.id for tweet in mentions))
                 
-                for tweet in mentions:
-                    # Skip if already processed
-                    if str(tweet.id) in self.processed_tweets:
-                        continue
+                # Drop already-processed mentions and the bot's own tweets up front
+                bot_user_id = int(self.bot_user_id) if self.bot_user_id else None
+                new_mentions = [
+                    tweet for tweet in mentions
+                    if tweet.user.id != bot_user_id and not self.is_processed(tweet.id)
+                ]
+                
+                logger.info("📬 Found %d mentions, %d new to process", len(mentions), len(new_mentions))
+                
+                if new_mentions:
+                    # Fetch every replied-to tweet in one lookup instead of one get_status per mention
+                    referenced = self.lookup_referenced_tweets(new_mentions)
                     
-                    # Skip if it's the bot's own tweet
-                    if tweet.user.id == int(self.bot_user_id):
-                        continue
+                    # API calls and replies run in parallel; wait for the whole batch
+                    list(self.executor.map(
+                        lambda tweet: self.process_meme_request(tweet, referenced),
+                        new_mentions
+                    ))
                     
-                    # Process the mention (any mention of @memezap)
-                    logger.info(f"👤 Processing mention from @{tweet.user.screen_name}: {tweet.full_text[:50]}...")
-                    self.process_meme_request(tweet)
-                        
                     # Mark as processed
-                    self.processed_tweets.add(str(tweet.id))
+                    self.mark_processed(tweet.id for tweet in new_mentions)
                 
-                self.save_processed_tweets()
+                # Advance the cursor only once the batch is handled, so a crash
+                # mid-batch leaves those mentions to be fetched again
+                self.since_id = newest_id
+                self.save_since_id(self.since_id)
                 
-            except tweepy.TooManyRequests:
+            except tweepy.TooManyRequests as e:
                 logger.warning("⏰ Rate limit hit, waiting...")
+                self.consecutive_errors += 1
+                reset = e.response.headers.get('x-rate-limit-reset') if e.response is not None else None
+                self.rate_limit_reset = int(reset) if reset else None
                 return
             except tweepy.Unauthorized:
                 logger.error("❌ Unauthorized - check API credentials")
+                self.consecutive_errors += 1
                 return
             except Exception as api_error:
-                logger.error(f"API error: {api_error}")
+                logger.error("API error: %s", api_error)
+                self.consecutive_errors += 1
                 return
                 
         except Exception as e:
-            logger.error(f"Error checking mentions: {e}")
+            logger.error("Error checking mentions: %s", e)
+    
+    def lookup_referenced_tweets(self, mentions):
+        """Batch-fetch the tweets the mentions reply to, keyed by tweet ID"""
+        reply_ids = list({tweet.in_reply_to_status_id for tweet in mentions if tweet.in_reply_to_status_id})
+        if not reply_ids:
+            return {}
+        
+        try:
+            statuses = self.api_v1.lookup_statuses(
+                reply_ids,
+                tweet_mode='extended',
+                include_entities=True
+            )
+            return {status.id: status for status in statuses}
+        except Exception as e:
+            logger.warning("Could not look up replied-to tweets: %s", e)
+            return None
+    
+    def allow_user_request(self, user_id):
+        """Record a request from user_id, returning False once they exceed the hourly limit"""
+        now = time.time()
+        cutoff = now - self.user_window
+        
+        with self.user_requests_lock:
+            timestamps = self.user_requests.setdefault(user_id, deque())
+            while timestamps and timestamps[0] <= cutoff:
+                timestamps.popleft()
+            
+            if len(timestamps) >= self.max_memes_per_user:
+                return False
+            timestamps.append(now)
+            
+            # Forget users with no requests left in the window
+            if len(self.user_requests) > 10000:
+                self.user_requests = {
+                    uid: ts for uid, ts in self.user_requests.items() if ts and ts[-1] > cutoff
+                }
+            return True
     
-    def process_meme_request(self, tweet):
+    def process_meme_request(self, tweet, referenced=None):
         """Process a meme request from ANY user"""
         try:
+            if not self.allow_user_request(tweet.user.id):
+                self.reply_rate_limited(tweet.id, tweet.user.screen_name)
+                return
+            
             # Extract image URL if present
             image_url = self.extract_image_url(tweet)
             
             if not image_url:
                 # Try to get image from quoted tweet or reply chain
-                image_url = self.get_image_from_context(tweet)
+                image_url = self.get_image_from_context(tweet, referenced)
             
             if not image_url:
                 self.reply_no_image(tweet.id, tweet.user.screen_name)
@@ -198,9 +374,23 @@ class MemeZapBot:
             # Extract text for meme
             meme_text = self.extract_meme_text(tweet.full_text)
             
-            # Create meme using MemeZap API
-            logger.info(f"🎨 Generating meme for @{tweet.user.screen_name}")
-            meme_image = self.create_meme_with_api(image_url, meme_text)
+            # Reuse a previously generated meme for the same image and text
+            cache_key = self.get_meme_cache_key(image_url, meme_text)
+            meme_image = self.load_cached_meme(cache_key)
+            
+            if meme_image:
+                logger.info("♻️ Reusing cached meme for @%s", tweet.user.screen_name)
+            else:
+                image_response = self.open_image_stream(image_url)
+                if not image_response:
+                    self.reply_no_image(tweet.id, tweet.user.screen_name)
+                    return
+                
+                # Create meme using MemeZap API
+                logger.info("🎨 Generating meme for @%s", tweet.user.screen_name)
+                meme_image = self.create_meme_with_api(image_response, meme_text, f"{tweet.id}.jpg")
+                if meme_image:
+                    self.save_cached_meme(cache_key, meme_image)
             
             if meme_image:
                 # Reply with meme
@@ -209,7 +399,7 @@ class MemeZapBot:
                 self.reply_error(tweet.id, tweet.user.screen_name)
                 
         except Exception as e:
-            logger.error(f"Error processing meme request: {e}")
+            logger.error("Error processing meme request: %s", e)
             self.reply_error(tweet.id, tweet.user.screen_name)
     
     def extract_image_url(self, tweet):
@@ -229,10 +419,10 @@ class MemeZapBot:
             return None
             
         except Exception as e:
-            logger.error(f"Error extracting image URL: {e}")
+            logger.error("Error extracting image URL: %s", e)
             return None
     
-    def get_image_from_context(self, tweet):
+    def get_image_from_context(self, tweet, referenced=None):
         """Get image from quoted tweet or reply chain"""
         try:
             # Check if this is a quote tweet
@@ -241,6 +431,11 @@ class MemeZapBot:
             
             # Check if this is a reply
             if tweet.in_reply_to_status_id:
+                if referenced is not None:
+                    # Already fetched by lookup_referenced_tweets; missing means deleted or protected
+                    referenced_tweet = referenced.get(tweet.in_reply_to_status_id)
+                    return self.extract_image_url(referenced_tweet) if referenced_tweet else None
+                
                 try:
                     referenced_tweet = self.api_v1.get_status(
                         tweet.in_reply_to_status_id,
@@ -254,28 +449,54 @@ class MemeZapBot:
             return None
             
         except Exception as e:
-            logger.error(f"Error getting image from context: {e}")
+            logger.error("Error getting image from context: %s", e)
+            return None
+    
+    def open_image_stream(self, image_url):
+        """Start streaming the tweet image, or return None if it is oversized or not an image"""
+        response = self.http.get(image_url, stream=True, timeout=30)
+        response.raise_for_status()
+        
+        content_length = int(response.headers.get('Content-Length', 0))
+        if content_length > self.max_image_bytes:
+            logger.info("🚫 Image too large (%d bytes): %s", content_length, image_url)
+            response.close()
+            return None
+        
+        content_type = response.headers.get('Content-Type', '')
+        if not content_type.startswith('image/'):
+            logger.info("🚫 Unsupported media type %r: %s", content_type, image_url)
+            response.close()
             return None
+        
+        return response
+    
+    def compile_text_patterns(self):
+        """Precompile the regexes used to clean meme text out of tweets"""
+        self._bot_mention_re = None
+        if self.bot_username:
+            self._bot_mention_re = re.compile(rf'@{re.escape(self.bot_username)}', re.IGNORECASE)
+        
+        # Longest phrases first so "make meme" wins over "meme"
+        phrases = sorted(self.trigger_phrases, key=len, reverse=True)
+        self._trigger_re = re.compile(
+            r'\b(?:' + '|'.join(map(re.escape, phrases)) + r')\b',
+            re.IGNORECASE
+        )
     
     def extract_meme_text(self, tweet_text):
         """Extract meme text from tweet"""
-        import re
-        
         # Remove bot mention
-        text = re.sub(f'@{self.bot_username}', '', tweet_text, flags=re.IGNORECASE)
+        text = tweet_text
+        if self._bot_mention_re:
+            text = self._bot_mention_re.sub('', text)
         
         # Remove trigger phrases
-        for phrase in self.trigger_phrases:
-            text = text.replace(phrase, "")
-        
-        # Remove other mentions and URLs
-        words = text.split()
-        filtered_words = [word for word in words if not word.startswith('@') and not word.startswith('http')]
-        
-        meme_text = ' '.join(filtered_words).strip()
+        text = self._trigger_re.sub('', text)
         
-        # Remove extra whitespace
-        meme_text = re.sub(r'\s+', ' ', meme_text)
+        # Remove other mentions and URLs, then collapse whitespace
+        text = _STRIP_RE.sub('', text)
+        meme_text = _WS_RE.sub(' ', text).strip()
         
         # Default text if empty
         if not meme_text or len(meme_text) < 3:
@@ -283,17 +504,67 @@ class MemeZapBot:
         
         return meme_text[:self.max_text_length]
     
-    def create_meme_with_api(self, image_url, text):
-        """Create meme using MemeZap API"""
+    def get_meme_cache_key(self, image_url, text):
+        """Hash the source image URL and normalized meme text into a cache key"""
+        normalized_text = ' '.join(text.lower().split())
+        key_source = f"{image_url}\n{normalized_text}".encode('utf-8')
+        return hashlib.blake2b(key_source, digest_size=16).hexdigest()
+    
+    def load_cached_meme(self, cache_key):
+        """Return a cached meme as BytesIO, or None on a cache miss"""
+        cache_path = self.meme_cache_dir / f"{cache_key}.jpg"
+        try:
+            meme_image = BytesIO(cache_path.read_bytes())
+            # Refresh the mtime so eviction treats this entry as recently used
+            os.utime(cache_path)
+            return meme_image
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Could not read cached meme %s: %s", cache_path, e)
+            return None
+    
+    def save_cached_meme(self, cache_key, meme_image):
+        """Store a generated meme so identical requests skip the MemeZap API"""
+        cache_path = self.meme_cache_dir / f"{cache_key}.jpg"
         try:
-            data = {
-                'image_url': image_url,
-                'caption': text
-            }
+            cache_path.write_bytes(meme_image.getvalue())
+        except Exception as e:
+            logger.warning("Could not cache meme %s: %s", cache_path, e)
+            return
+        self.prune_meme_cache()
+    
+    def prune_meme_cache(self):
+        """Delete the least recently used cached memes until the cache fits its size cap"""
+        with self.meme_cache_lock:
+            entries = []
+            for path in self.meme_cache_dir.glob('*.jpg'):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+                if total <= self.meme_cache_max_bytes:
+                    break
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+    
+    def create_meme_with_api(self, image_response, text, filename='tweet_image.jpg'):
+        """Create meme using MemeZap API, streaming the tweet image through as an upload"""
+        try:
+            image_response.raw.decode_content = True
+            content_type = image_response.headers.get('Content-Type', 'image/jpeg')
             
-            response = requests.post(
+            response = self.http.post(
                 self.memezap_api_url,
-                data=data,
+                files={'image': (filename, image_response.raw, content_type)},
+                data={'caption': text},
                 timeout=120
             )
             
@@ -301,12 +572,14 @@ class MemeZapBot:
                 logger.info("✅ Meme generated successfully")
                 return BytesIO(response.content)
             else:
-                logger.error(f"❌ MemeZap API error: {response.status_code}")
+                logger.error("❌ MemeZap API error: %s", response.status_code)
                 return None
                 
         except Exception as e:
-            logger.error(f"Error calling MemeZap API: {e}")
+            logger.error("Error calling MemeZap API: %s", e)
             return None
+        finally:
+            image_response.close()
     
     def reply_with_meme(self, tweet_id, username, meme_image):
         """Reply with generated meme"""
@@ -322,10 +595,10 @@ class MemeZapBot:
                 media_ids=[media.media_id]
             )
             
-            logger.info(f"✅ Replied to @{username} with meme")
+            logger.info("✅ Replied to @%s with meme", username)
             
         except Exception as e:
-            logger.error(f"Error replying with meme: {e}")
+            logger.error("Error replying with meme: %s", e)
     
     def reply_no_image(self, tweet_id, username):
         """Reply when no image found"""
@@ -337,10 +610,10 @@ class MemeZapBot:
                 in_reply_to_status_id=tweet_id
             )
             
-            logger.info(f"📝 Replied to @{username} - no image found")
+            logger.info("📝 Replied to @%s - no image found", username)
             
         except Exception as e:
-            logger.error(f"Error replying no image: {e}")
+            logger.error("Error replying no image: %s", e)
     
     def reply_error(self, tweet_id, username):
         """Reply when error occurs"""
@@ -352,38 +625,127 @@ class MemeZapBot:
                 in_reply_to_status_id=tweet_id
             )
             
-            logger.info(f"⚠️ Replied to @{username} - error occurred")
+            logger.info("⚠️ Replied to @%s - error occurred", username)
             
         except Exception as e:
-            logger.error(f"Error replying error: {e}")
+            logger.error("Error replying error: %s", e)
+    
+    def reply_rate_limited(self, tweet_id, username):
+        """Reply when a user has hit their hourly meme limit"""
+        try:
+            reply_text = f"@{username} Whoa, that's a lot of memes! 🐢 You've hit the limit of {self.max_memes_per_user} per hour, please try again later."
+            
+            self.api_v1.update_status(
+                status=reply_text,
+                in_reply_to_status_id=tweet_id
+            )
+            
+            logger.info("🐢 Replied to @%s - rate limited", username)
+            
+        except Exception as e:
+            logger.error("Error replying rate limited: %s", e)
+    
+    def get_sleep_interval(self):
+        """Seconds to wait before the next poll, backing off exponentially on errors"""
+        if self.rate_limit_reset:
+            # Twitter told us exactly when the rate-limit window reopens
+            return max(self.rate_limit_reset - time.time() + 1, self.check_interval)
+        
+        if not self.consecutive_errors:
+            return self.check_interval
+        
+        backoff = min(self.max_backoff, self.check_interval * 2 ** self.consecutive_errors)
+        return backoff + random.uniform(0, self.check_interval * 0.1)
+    
+    def handle_streamed_mention(self, tweet_id):
+        """Queue a mention pushed by the filtered stream for processing"""
+        if self.is_processed(tweet_id):
+            return
+        
+        # Skip redeliveries of a mention that is still being worked on
+        with self.streamed_lock:
+            if tweet_id in self.streamed_in_flight:
+                return
+            self.streamed_in_flight.add(tweet_id)
+        
+        future = self.executor.submit(self.process_streamed_mention, tweet_id)
+        future.add_done_callback(lambda f: self.finish_streamed_mention(tweet_id, f))
+    
+    def process_streamed_mention(self, tweet_id):
+        """Fetch a streamed mention and reply to it; returns False if it should be retried"""
+        try:
+            # The stream delivers v2 tweets; fetch the v1.1 status the reply path expects
+            tweet = self.api_v1.get_status(tweet_id, tweet_mode='extended', include_entities=True)
+        except Exception as e:
+            logger.error("Could not fetch streamed mention %s: %s", tweet_id, e)
+            return False
+        
+        if tweet.user.id == self.bot_user_id:
+            return True
+        
+        logger.info("👤 Processing mention from @%s: %s...", tweet.user.screen_name, tweet.full_text[:50])
+        self.process_meme_request(tweet)
+        return True
+    
+    def finish_streamed_mention(self, tweet_id, future):
+        """Mark a streamed mention processed once its job has completed"""
+        with self.streamed_lock:
+            self.streamed_in_flight.discard(tweet_id)
+        if future.exception() is None and future.result():
+            self.mark_processed([tweet_id])
+    
+    def run_stream(self):
+        """Receive mentions from the v2 filtered stream instead of polling"""
+        stream = MentionStream(self)
+        
+        rule = f"@{self.bot_username}"
+        existing_rules = stream.get_rules().data or []
+        if not any(existing.value == rule for existing in existing_rules):
+            stream.add_rules(tweepy.StreamRule(rule))
+        
+        logger.info("🚀 Starting MemeZap Bot in streaming mode...")
+        logger.info("🎯 Streaming mentions of @%s", self.bot_username)
+        logger.info("🔗 MemeZap API: %s", self.memezap_api_url)
+        
+        try:
+            stream.filter()
+        except KeyboardInterrupt:
+            logger.info("🛑 Bot stopped by user")
+            stream.disconnect()
+            self.executor.shutdown(wait=False)
     
     def run(self):
         """Main bot loop"""
         logger.info("🚀 Starting MemeZap Bot...")
-        logger.info(f"🎯 Listening for mentions of @{self.bot_username}")
-        logger.info(f"🔗 MemeZap API: {self.memezap_api_url}")
-        logger.info(f"⏱️ Check interval: {self.check_interval} seconds")
+        logger.info("🎯 Listening for mentions of @%s", self.bot_username)
+        logger.info("🔗 MemeZap API: %s", self.memezap_api_url)
+        logger.info("⏱️ Check interval: %d seconds", self.check_interval)
         
         while True:
             try:
                 logger.info("👀 Checking for new mentions...")
                 self.check_mentions()
-                logger.info(f"😴 Sleeping for {self.check_interval} seconds...")
-                time.sleep(self.check_interval)
+                sleep_interval = self.get_sleep_interval()
+                logger.info("😴 Sleeping for %.0f seconds...", sleep_interval)
+                time.sleep(sleep_interval)
             except KeyboardInterrupt:
                 logger.info("🛑 Bot stopped by user")
+                self.executor.shutdown(wait=False)
                 break
             except Exception as e:
-                logger.error(f"Unexpected error: {e}")
+                logger.error("Unexpected error: %s", e)
                 time.sleep(60)
 
 def main():
     """Entry point"""
     try:
         bot = MemeZapBot()
-        bot.run()
+        if os.getenv('BOT_MODE', 'poll').lower() == 'stream':
+            bot.run_stream()
+        else:
+            bot.run()
     except Exception as e:
-        logger.error(f"Failed to start bot: {e}")
+        logger.error("Failed to start bot: %s", e)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
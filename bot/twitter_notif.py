@@ -7,11 +7,19 @@ Automatically posts promotional tweets when memes are generated via smart_genera
 import tweepy
 import os
 import logging
+import hashlib
+import json
+import time
+import threading
+from collections import OrderedDict, deque
 from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from io import BytesIO
 from PIL import Image
-import tempfile
 from openai import OpenAI
 from dotenv import load_dotenv
 
@@ -43,9 +51,26 @@ class TwitterNotificationService:
             logger.error("Missing Twitter API credentials")
             raise ValueError("Missing Twitter API credentials in environment variables")
         
+        # Pooled HTTP session so meme image downloads reuse the CDN connection
+        self.http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(total=3, backoff_factor=0.3)
+        )
+        self.http.mount('https://', adapter)
+        self.http.mount('http://', adapter)
+        
         # Setup Twitter clients
         self.setup_twitter_clients()
         
+        # Promo tweets for repeated inputs are reused instead of regenerated. Each input keeps
+        # a small ring of generations served in turn, since Twitter rejects duplicate statuses.
+        self._promo_cache = OrderedDict()
+        self._promo_cache_size = 512
+        self._promo_ring_size = 3
+        self._promo_lock = threading.Lock()
+        
         # Configuration
         self.enabled = os.getenv('TWITTER_NOTIFICATIONS_ENABLED', 'true').lower() == 'true'
         
@@ -66,14 +91,37 @@ class TwitterNotificationService:
                 wait_on_rate_limit=True
             )
             
-            # Test authentication
-            me = self.api_v1.verify_credentials()
-            logger.info(f"🤖 Twitter notification service authenticated as @{me.screen_name}")
+            # Test authentication (cached across worker restarts)
+            screen_name = self.verify_credentials_cached()
+            logger.info(f"🤖 Twitter notification service authenticated as @{screen_name}")
             
         except Exception as e:
             logger.error(f"Failed to authenticate with Twitter API: {e}")
             raise
     
+    def verify_credentials_cached(self, cache_path=Path(__file__).parent.parent / '.twitter_me_cache.json', ttl=24 * 3600):
+        """Return the authenticated screen name, calling verify_credentials at most once per TTL"""
+        token_hash = hashlib.sha256(self.access_token.encode('utf-8')).hexdigest()
+        try:
+            with open(cache_path, 'r') as f:
+                cached = json.load(f)
+            if cached.get('token_hash') == token_hash and time.time() - cached.get('verified_at', 0) < ttl:
+                return cached['screen_name']
+        except (OSError, ValueError, KeyError):
+            pass
+        
+        me = self.api_v1.verify_credentials()
+        try:
+            with open(cache_path, 'w') as f:
+                json.dump({
+                    'token_hash': token_hash,
+                    'screen_name': me.screen_name,
+                    'verified_at': time.time()
+                }, f)
+        except OSError as e:
+            logger.warning(f"Could not cache Twitter credentials check: {e}")
+        return me.screen_name
+    
     def generate_promotional_tweet(self, input_text, meme_generated=True):
         """Generate a promotional tweet using OpenAI"""
         if not self.openai_client:
@@ -88,54 +136,78 @@ class TwitterNotificationService:
             return random.choice(fallback_messages)
         
         try:
-            # Create a prompt for OpenAI to generate an engaging promotional tweet
-            prompt = f"""
-            Create an engaging, fun promotional tweet for our meme generation platform called MemeZap. 
-            
-            Context:
-            - Someone just used our AI-powered meme generator
-            - Their input text was: "{input_text}"
-            - We successfully generated a meme from their text
-            - We want to create buzz about our meme generation engine
-            - Keep it under 280 characters
-            - Make it sound exciting and viral-worthy
-            - Include relevant hashtags
-            - Don't be too salesy, make it fun and engaging
-            - Mention that it's AI-powered
-            
-            Generate a single tweet that celebrates this meme creation and promotes our platform.
-            """
-            
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a social media expert who creates viral, engaging tweets for a meme generation platform. Keep tweets fun, energetic, and under 280 characters."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=100,
-                temperature=0.8
-            )
-            
-            tweet_text = response.choices[0].message.content.strip()
-            
-            # Ensure it's under 280 characters (leaving room for media)
-            if len(tweet_text) > 250:
-                tweet_text = tweet_text[:247] + "..."
-            
-            logger.info(f"Generated promotional tweet: {tweet_text}")
-            return tweet_text
-            
+            # Normalize whitespace so trivially different inputs share a cache entry
+            return self._openai_promo(' '.join(input_text.split()))
         except Exception as e:
             logger.error(f"Error generating promotional tweet with OpenAI: {e}")
             # Fallback to default message
             return f"🔥 Just generated another epic meme! Input: '{input_text}' → Pure meme magic! ✨ Try MemeZap for AI-powered meme creation! #MemeZap #AI #Memes"
     
+    def _openai_promo(self, input_text):
+        """Return a promo for input_text, rotating through up to _promo_ring_size generations"""
+        with self._promo_lock:
+            ring = self._promo_cache.get(input_text)
+            if ring is not None:
+                self._promo_cache.move_to_end(input_text)
+                if len(ring) >= self._promo_ring_size:
+                    ring.rotate(-1)
+                    return ring[-1]
+        
+        # Ring not full yet: generate a fresh promo outside the lock
+        tweet_text = self._generate_openai_promo(input_text)
+        with self._promo_lock:
+            ring = self._promo_cache.setdefault(input_text, deque(maxlen=self._promo_ring_size))
+            ring.append(tweet_text)
+            self._promo_cache.move_to_end(input_text)
+            while len(self._promo_cache) > self._promo_cache_size:
+                self._promo_cache.popitem(last=False)
+        return tweet_text
+    
+    def _generate_openai_promo(self, input_text):
+        """Ask OpenAI for a promotional tweet; errors propagate so fallbacks are never cached"""
+        # Create a prompt for OpenAI to generate an engaging promotional tweet
+        prompt = f"""
+        Create an engaging, fun promotional tweet for our meme generation platform called MemeZap. 
+        
+        Context:
+        - Someone just used our AI-powered meme generator
+        - Their input text was: "{input_text}"
+        - We successfully generated a meme from their text
+        - We want to create buzz about our meme generation engine
+        - Keep it under 280 characters
+        - Make it sound exciting and viral-worthy
+        - Include relevant hashtags
+        - Don't be too salesy, make it fun and engaging
+        - Mention that it's AI-powered
+        
+        Generate a single tweet that celebrates this meme creation and promotes our platform.
+        """
+        
+        response = self.openai_client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You are a social media expert who creates viral, engaging tweets for a meme generation platform. Keep tweets fun, energetic, and under 280 characters."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=100,
+            temperature=0.8
+        )
+        
+        tweet_text = response.choices[0].message.content.strip()
+        
+        # Ensure it's under 280 characters (leaving room for media)
+        if len(tweet_text) > 250:
+            tweet_text = tweet_text[:247] + "..."
+        
+        logger.info(f"Generated promotional tweet: {tweet_text}")
+        return tweet_text
+    
     def download_image(self, image_path_or_url):
         """Download image from local path or URL and return as BytesIO"""
         try:
             if image_path_or_url.startswith('http'):
                 # Download from URL
-                response = requests.get(image_path_or_url, timeout=30)
+                response = self.http.get(image_path_or_url, timeout=30)
                 response.raise_for_status()
                 return BytesIO(response.content)
             else:
@@ -146,6 +218,21 @@ class TwitterNotificationService:
             logger.error(f"Error downloading image: {e}")
             return None
     
+    def prepare_upload_image(self, image_data, max_size=2048):
+        """Downscale and re-encode the meme as JPEG so uploads stay small"""
+        try:
+            img = Image.open(image_data)
+            img.thumbnail((max_size, max_size), Image.LANCZOS)
+            
+            buf = BytesIO()
+            img.convert('RGB').save(buf, 'JPEG', quality=85, optimize=True, progressive=True)
+            buf.seek(0)
+            return buf
+        except Exception as e:
+            logger.warning(f"Could not re-encode meme image, uploading original: {e}")
+            image_data.seek(0)
+            return image_data
+    
     def post_meme_notification(self, input_text, meme_image_path, from_template=False, similarity_score=0):
         """Post a promotional tweet with the generated meme"""
         if not self.enabled:
@@ -168,30 +255,20 @@ class TwitterNotificationService:
                 logger.error("Failed to download meme image for Twitter post")
                 return False
             
-            # Save image to temporary file for upload
-            with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as temp_file:
-                temp_file.write(image_data.getvalue())
-                temp_file_path = temp_file.name
+            # Upload the in-memory image directly, no temp file needed
+            upload_data = self.prepare_upload_image(image_data)
+            media = self.api_v1.media_upload(filename='meme.jpg', file=upload_data)
+            media_id = media.media_id
+            
+            # Post tweet with media using v2 client
+            tweet = self.client_v2.create_tweet(
+                text=tweet_text,
+                media_ids=[media_id]
+            )
             
-            try:
-                # Upload media using simple_upload (like in reference code)
-                media = self.api_v1.simple_upload(filename=temp_file_path)
-                media_id = media.media_id
-                
-                # Post tweet with media using v2 client
-                tweet = self.client_v2.create_tweet(
-                    text=tweet_text,
-                    media_ids=[media_id]
-                )
-                
-                logger.info(f"✅ Successfully posted promotional tweet: {tweet.data['id']}")
-                logger.info(f"Tweet text: {tweet_text}")
-                return True
-                
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_file_path):
-                    os.remove(temp_file_path)
+            logger.info(f"✅ Successfully posted promotional tweet: {tweet.data['id']}")
+            logger.info(f"Tweet text: {tweet_text}")
+            return True
             
         except tweepy.TooManyRequests:
             logger.warning("⏰ Twitter rate limit hit, skipping notification")
@@ -218,12 +295,47 @@ class TwitterNotificationService:
             logger.error(f"Error posting simple notification to Twitter: {e}")
             return False
 
-# Global instance for easy import
-twitter_notifier = TwitterNotificationService()
+# Shared notifier, built on first use; the lock keeps concurrent first calls from
+# each constructing (and authenticating) their own instance
+_notifier = None
+_notifier_lock = threading.Lock()
+
+# Background workers so posting never blocks the API response; the notifier itself
+# is built on these threads too. Threads start lazily on first submit, so this is
+# safe with preload_app.
+_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='twitter-notif')
+
+def get_notifier():
+    """Get the shared TwitterNotificationService, creating it on first use"""
+    global _notifier
+    if _notifier is None:
+        with _notifier_lock:
+            if _notifier is None:
+                _notifier = TwitterNotificationService()
+    return _notifier
+
+def _log_notification_result(future):
+    """Log the outcome of a background notification"""
+    try:
+        if future.result():
+            logger.info("✅ Successfully posted promotional tweet about generated meme")
+        else:
+            logger.info("ℹ️ Twitter notification was not posted (disabled or failed)")
+    except Exception as e:
+        logger.error(f"Error posting Twitter notification: {e}")
+
+def _post_meme_notification(input_text, meme_image_path, from_template, similarity_score):
+    """Build the notifier if needed and post the meme; runs on the background pool"""
+    return get_notifier().post_meme_notification(
+        input_text=input_text,
+        meme_image_path=meme_image_path,
+        from_template=from_template,
+        similarity_score=similarity_score
+    )
 
 def notify_meme_generated(input_text, meme_image_path, from_template=False, similarity_score=0):
     """
-    Convenience function to notify about meme generation
+    Convenience function to notify about meme generation in the background
     
     Args:
         input_text (str): The original text input from user
@@ -232,18 +344,21 @@ def notify_meme_generated(input_text, meme_image_path, from_template=False, simi
         similarity_score (float): Template similarity score (0-100)
     
     Returns:
-        bool: True if notification was posted successfully
+        Future: Resolves to True if the notification was posted, or None if it could not be queued
     """
     try:
-        return twitter_notifier.post_meme_notification(
+        future = _pool.submit(
+            _post_meme_notification,
             input_text=input_text,
             meme_image_path=meme_image_path,
             from_template=from_template,
             similarity_score=similarity_score
         )
+        future.add_done_callback(_log_notification_result)
+        return future
     except Exception as e:
         logger.error(f"Error in notify_meme_generated: {e}")
-        return False
+        return None
 
 def notify_simple(input_text):
     """
@@ -256,7 +371,7 @@ def notify_simple(input_text):
         bool: True if notification was posted successfully
     """
     try:
-        return twitter_notifier.post_simple_notification(input_text)
+        return get_notifier().post_simple_notification(input_text)
     except Exception as e:
         logger.error(f"Error in notify_simple: {e}")
         return False
@@ -0,0 +1,12 @@
+"""
+Project root shared by the scripts in this directory.
+"""
+import sys
+from pathlib import Path
+
+# Resolved once per process, however many scripts import it
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Make the project packages (ai_services, utils, ...) importable from the scripts
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
@@ -3,9 +3,13 @@ from pathlib import Path
 import sys
 import logging
 import shutil
+import numpy as np
+import torch
+from PIL import Image
+from torch.utils.data import Dataset, DataLoader
 
 # Add parent directory to sys.path to allow importing from other modules
-sys.path.append(str(Path(__file__).parent.parent))
+from _paths import PROJECT_ROOT
 from ai_services.image_vector_db import ImageVectorDB
 from ai_services.meme_service import MemeService
 
@@ -13,7 +17,36 @@ from ai_services.meme_service import MemeService
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def build_vector_db(image_folder="data/meme_templates", db_path="data/image_vectors.npz", clean_images=False):
+class MemeImageDataset(Dataset):
+    """Decodes and preprocesses template images so DataLoader workers can run ahead of the model"""
+    
+    def __init__(self, entries, processor):
+        self.entries = entries
+        self.processor = processor
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def __getitem__(self, idx):
+        embed_path, original_path = self.entries[idx]
+        try:
+            image = Image.open(embed_path).convert("RGB")
+            pixel_values = self.processor(images=image, return_tensors="pt")["pixel_values"][0]
+            return pixel_values, original_path
+        except Exception as e:
+            logger.error("Error processing %s: %s", original_path, e)
+            return None
+
+def collate_images(items):
+    """Stack the readable images in a batch, skipping ones that failed to load"""
+    items = [item for item in items if item is not None]
+    if not items:
+        return None, []
+    pixel_values, paths = zip(*items)
+    return torch.stack(pixel_values), list(paths)
+
+def build_vector_db(image_folder="data/meme_templates", db_path="data/image_vectors.npz", clean_images=False,
+                    batch_size=32, device=None):
     """
     Build a vector database from images in the specified folder.
     
@@ -21,82 +54,107 @@ def build_vector_db(image_folder="data/meme_templates", db_path="data/image_vect
         image_folder: Path to folder containing template images
         db_path: Path to save the vector DB
         clean_images: Whether to clean text from images before adding to DB (default: False)
+        batch_size: Number of images embedded per forward pass (default: 32)
+        device: Torch device for the CLIP model (default: cuda if available, else cpu)
     """
     # Clear existing database by creating a new one
-    logger.info(f"Creating a new vector database at {db_path}")
+    logger.info("Creating a new vector database at %s", db_path)
     if os.path.exists(db_path):
         os.remove(db_path)
     
-    vector_db = ImageVectorDB(db_path=db_path)
+    if device is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    vector_db = ImageVectorDB(db_path=db_path, device=device)
     meme_service = MemeService() if clean_images else None
     
     # Get absolute paths
-    project_root = Path(__file__).parent.parent
+    project_root = PROJECT_ROOT
     image_folder = project_root / image_folder
     cleaned_folder = project_root / "data" / "cleaned_templates"
     
     # Ensure cleaned templates directory exists
     if clean_images:
         if cleaned_folder.exists():
-            logger.info(f"Clearing existing cleaned templates directory: {cleaned_folder}")
+            logger.info("Clearing existing cleaned templates directory: %s", cleaned_folder)
             shutil.rmtree(cleaned_folder)
         cleaned_folder.mkdir(parents=True, exist_ok=True)
     
     # Find all image files
-    image_files = []
-    for ext in ['.jpg', '.jpeg', '.png']:
-        image_files.extend(list(image_folder.glob(f"*{ext}")))
+    image_exts = {'.jpg', '.jpeg', '.png'}
+    image_files = [
+        Path(entry.path) for entry in os.scandir(image_folder)
+        if entry.is_file() and os.path.splitext(entry.name)[1].lower() in image_exts
+    ]
     
-    logger.info(f"Found {len(image_files)} images in {image_folder}")
-    logger.info(f"Using original images (without text cleaning)")
+    logger.info("Found %d images in %s", len(image_files), image_folder)
+    logger.info("Using original images (without text cleaning)")
     
+    # Pair each image to embed with the original path stored in the vector DB
+    to_embed = []
     for i, img_path in enumerate(image_files):
-        try:
-            logger.info(f"Processing [{i+1}/{len(image_files)}] {img_path}")
-            
-            # Always store the original path in the vector DB
-            original_path = str(img_path)
-            
-            # If cleaning images, clean text first
-            if clean_images:
-                cleaned_filename = f"cleaned_{img_path.name}"
-                cleaned_path = cleaned_folder / cleaned_filename
-                
-                logger.info(f"  Cleaning text from {img_path.name}")
-                try:
-                    meme_service.remove_text_and_inpaint(
-                        str(img_path), 
-                        min_confidence=0.5,
-                        output_path=str(cleaned_path)
-                    )
-                    
-                    # Get embedding from cleaned image but store original path
-                    embedding = vector_db.get_image_embedding(str(cleaned_path))
-                    vector_db.embeddings.append(embedding)
-                    vector_db.image_paths.append(original_path)
-                    logger.info(f"  Added to vector DB: {img_path.name} (using cleaned version)")
-                except Exception as e:
-                    logger.warning(f"  Cleaning failed for {img_path.name}: {e}")
-                    logger.info(f"  Falling back to original image")
-                    
-                    # Add original image embedding with original path
-                    embedding = vector_db.get_image_embedding(original_path)
-                    vector_db.embeddings.append(embedding)
-                    vector_db.image_paths.append(original_path)
-                    logger.info(f"  Added to vector DB: {img_path.name} (using original)")
-            else:
-                # Add original image embedding with original path
-                embedding = vector_db.get_image_embedding(original_path)
-                vector_db.embeddings.append(embedding)
-                vector_db.image_paths.append(original_path)
-                logger.info(f"  Added to vector DB: {img_path.name}")
-            
-        except Exception as e:
-            logger.error(f"Error processing {img_path}: {e}")
+        # Always store the original path in the vector DB
+        original_path = str(img_path)
+        embed_path = original_path
+        
+        # If cleaning images, clean text first
+        if clean_images:
+            logger.info("Cleaning [%d/%d] %s", i+1, len(image_files), img_path.name)
+            cleaned_path = cleaned_folder / f"cleaned_{img_path.name}"
+            try:
+                meme_service.remove_text_and_inpaint(
+                    str(img_path), 
+                    min_confidence=0.5,
+                    output_path=str(cleaned_path)
+                )
+                # Get embedding from cleaned image but store original path
+                embed_path = str(cleaned_path)
+            except Exception as e:
+                logger.warning("  Cleaning failed for %s: %s", img_path.name, e)
+                logger.info("  Falling back to original image")
+        
+        to_embed.append((embed_path, original_path))
+    
+    # Decode/preprocess in worker processes while the model embeds the previous batch
+    loader = DataLoader(
+        MemeImageDataset(to_embed, vector_db.clip_processor),
+        batch_size=batch_size,
+        num_workers=min(8, os.cpu_count() or 1),
+        pin_memory=(device != "cpu"),
+        collate_fn=collate_images
+    )
+    # Stream embeddings into a float16 memmap scratch file (the on-disk dtype) and the
+    # matching paths into a text file, flushing both per batch so a crash keeps partial work
+    scratch_embeddings = f"{db_path}.dat"
+    scratch_paths = f"{db_path}.paths"
+    embeddings = None
+    image_paths = []
+    with open(scratch_paths, "w") as paths_fp:
+        for pixel_values, original_paths in loader:
+            if not original_paths:
+                continue
+            batch_embeddings = vector_db.embed_pixel_values(pixel_values)
+            if embeddings is None:
+                embeddings = np.memmap(scratch_embeddings, dtype=np.float16, mode="w+",
+                                       shape=(len(to_embed), batch_embeddings.shape[1]))
+            embeddings[len(image_paths):len(image_paths) + len(batch_embeddings)] = batch_embeddings
+            embeddings.flush()
+            paths_fp.write("\n".join(original_paths) + "\n")
+            paths_fp.flush()
+            image_paths.extend(original_paths)
+            logger.info("Embedded [%d/%d]", len(image_paths), len(to_embed))
+    
+    if embeddings is not None:
+        # Unreadable images leave unused rows at the end
+        vector_db.embeddings = np.array(embeddings[:len(image_paths)])
+        vector_db.image_paths = image_paths
+        del embeddings
     
     # Save the database
     vector_db._save()
-    logger.info(f"Vector DB built with {len(vector_db.image_paths)} images and saved to {db_path}")
+    for scratch in (scratch_embeddings, scratch_paths):
+        if os.path.exists(scratch):
+            os.remove(scratch)
+    logger.info("Vector DB built with %d images and saved to %s", len(vector_db.image_paths), db_path)
     logger.info("To search for similar images, use: python scripts/sim_search.py path/to/image.jpg")
 
 if __name__ == "__main__":
@@ -105,6 +163,8 @@ if __name__ == "__main__":
     parser.add_argument("--folder", default="data/meme_templates", help="Path to folder containing template images")
     parser.add_argument("--db-path", default="data/image_vectors.npz", help="Path to save the vector DB")
     parser.add_argument("--clean", action="store_true", help="Enable text cleaning (disabled by default)")
+    parser.add_argument("--batch-size", type=int, default=32, help="Images embedded per forward pass")
+    parser.add_argument("--device", default=None, help="Torch device (default: cuda if available, else cpu)")
     
     args = parser.parse_args()
-    build_vector_db(args.folder, args.db_path, args.clean) 
\ No newline at end of file
+    build_vector_db(args.folder, args.db_path, args.clean, args.batch_size, args.device) 
\ No newline at end of file
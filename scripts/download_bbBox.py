@@ -2,13 +2,43 @@ import cv2
 import easyocr
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import hashlib
+import functools
 import os
 from pathlib import Path
 from googleapiclient.discovery import build
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared pooled session so example downloads reuse connections
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+})
+_SESSION.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=Retry(total=3, backoff_factor=0.3)))
+_SESSION.mount('http://', HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=Retry(total=3, backoff_factor=0.3)))
+
+# EasyOCR models are loaded once per process and shared by every analyzer
+_READER = None
+
+def get_reader():
+    """Get the shared EasyOCR reader, loading it on first use"""
+    global _READER
+    if _READER is None:
+        _READER = easyocr.Reader(['en'])
+    return _READER
+
+@functools.lru_cache(maxsize=64)
+def _load_font(size):
+    """Load Arial at the given size, falling back to Pillow's default font"""
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
 
 class MemeTemplateAnalyzer:
     def __init__(self, google_api_key, search_engine_id):
@@ -19,7 +49,7 @@ class MemeTemplateAnalyzer:
         self.google_api_key = google_api_key
         self.search_engine_id = search_engine_id
         self.service = build("customsearch", "v1", developerKey=google_api_key)
-        self.reader = easyocr.Reader(['en'])
+        self.reader = get_reader()
         self.templates_db = {}
         self.cache_dir = Path("meme_cache")
         self.cache_dir.mkdir(exist_ok=True)
@@ -56,57 +86,100 @@ class MemeTemplateAnalyzer:
             print(f"Error searching for {meme_name}: {e}")
             return []
     
-    def download_image(self, url, filename):
-        """Download image from URL"""
+    def fetch_image(self, url):
+        """Fetch image bytes from URL, or None if the request fails"""
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=10)
+            response = _SESSION.get(url, timeout=10)
             response.raise_for_status()
-            
-            with open(filename, 'wb') as f:
-                f.write(response.content)
-            return True
+            return response.content
         except Exception as e:
             print(f"Error downloading {url}: {e}")
+            return None
+    
+    def download_image(self, url, filename):
+        """Download image from URL"""
+        content = self.fetch_image(url)
+        if content is None:
             return False
+        
+        with open(filename, 'wb') as f:
+            f.write(content)
+        return True
     
     def get_image_hash(self, image_path):
         """Generate hash for image to avoid duplicates"""
+        # Stream in 1 MB chunks so memory use doesn't grow with the image size
+        digest = hashlib.blake2b(digest_size=16)
         with open(image_path, 'rb') as f:
-            return hashlib.md5(f.read()).hexdigest()
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def extract_text_regions(self, results, scale_x=1.0, scale_y=1.0):
+        """Filter EasyOCR results into sorted rectangular regions, rescaling boxes if needed"""
+        text_regions = []
+        for (bbox, text, confidence) in results:
+            if confidence > 0.3 and len(text.strip()) > 1:  # Filter low confidence and single chars
+                # Convert polygon bbox to rectangle
+                bbox_array = (np.array(bbox, dtype=np.float64) * [scale_x, scale_y]).astype(np.int32)
+                x, y, w, h = cv2.boundingRect(bbox_array)
+                
+                text_regions.append({
+                    "bbox": [x, y, x + w, y + h],
+                    "text": text.strip(),
+                    "confidence": confidence,
+                    "area": w * h
+                })
+        
+        # Sort by position (top to bottom, left to right)
+        text_regions.sort(key=lambda r: (r["bbox"][1], r["bbox"][0]))
+        return text_regions
     
     def detect_text_regions(self, image_path):
-        """Detect text regions in an image using EasyOCR"""
+        """Detect text regions in an image using EasyOCR, returning (regions, (height, width))"""
         try:
             image = cv2.imread(image_path)
             if image is None:
-                return []
+                return [], None
                 
             results = self.reader.readtext(image)
-            
-            text_regions = []
-            for (bbox, text, confidence) in results:
-                if confidence > 0.3 and len(text.strip()) > 1:  # Filter low confidence and single chars
-                    # Convert polygon bbox to rectangle
-                    bbox_array = np.array(bbox, dtype=np.int32)
-                    x, y, w, h = cv2.boundingRect(bbox_array)
-                    
-                    text_regions.append({
-                        "bbox": [x, y, x + w, y + h],
-                        "text": text.strip(),
-                        "confidence": confidence,
-                        "area": w * h
-                    })
-            
-            # Sort by position (top to bottom, left to right)
-            text_regions.sort(key=lambda r: (r["bbox"][1], r["bbox"][0]))
-            return text_regions
+            return self.extract_text_regions(results), image.shape[:2]
             
         except Exception as e:
             print(f"Error detecting text in {image_path}: {e}")
-            return []
+            return [], None
+    
+    def detect_text_regions_batch(self, image_paths, batch_size=8):
+        """
+        Detect text regions in several images with one batched EasyOCR call.
+        
+        Returns a list of (regions, (height, width)) in the same order as image_paths.
+        """
+        images = [cv2.imread(str(path)) for path in image_paths]
+        readable = [i for i, image in enumerate(images) if image is not None]
+        outputs = [([], None)] * len(image_paths)
+        if not readable:
+            return outputs
+        
+        # readtext_batched resizes every image to a common size; boxes are scaled back below
+        n_height = max(images[i].shape[0] for i in readable)
+        n_width = max(images[i].shape[1] for i in readable)
+        
+        try:
+            batch_results = self.reader.readtext_batched(
+                [images[i] for i in readable],
+                n_width=n_width,
+                n_height=n_height,
+                batch_size=batch_size
+            )
+        except Exception as e:
+            print(f"Batched text detection failed ({e}), falling back to one image at a time")
+            return [self.detect_text_regions(str(path)) for path in image_paths]
+        
+        for i, results in zip(readable, batch_results):
+            h, w = images[i].shape[:2]
+            outputs[i] = (self.extract_text_regions(results, w / n_width, h / n_height), (h, w))
+        return outputs
     
     def analyze_meme_template(self, meme_name, max_examples=10):
         """Main function to analyze a meme template"""
@@ -127,20 +200,35 @@ class MemeTemplateAnalyzer:
         all_text_regions = []
         downloaded_images = []
         
-        for i, img_data in enumerate(image_urls):
+        # Fetch all examples concurrently; files are written here, in order, so
+        # the worker threads only do network I/O
+        filenames = [self.cache_dir / f"{meme_name}_{i}.jpg" for i in range(len(image_urls))]
+        downloaded = []
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            contents = executor.map(self.fetch_image, [img_data['url'] for img_data in image_urls])
+            for filename, content in zip(filenames, contents):
+                if content is not None:
+                    with open(filename, 'wb') as f:
+                        f.write(content)
+                downloaded.append(content is not None)
+        
+        # Detect text in all downloaded images in one batched OCR pass
+        ok_filenames = [filename for filename, ok in zip(filenames, downloaded) if ok]
+        detections = dict(zip(ok_filenames, self.detect_text_regions_batch(ok_filenames)))
+        
+        for i, (img_data, filename, ok) in enumerate(zip(image_urls, filenames, downloaded)):
             url = img_data['url']
-            filename = self.cache_dir / f"{meme_name}_{i}.jpg"
             
-            if self.download_image(url, filename):
-                # Detect text in the image
-                text_regions = self.detect_text_regions(str(filename))
+            if ok:
+                text_regions, shape = detections[filename]
                 
                 if text_regions:  # Only keep images with detected text
                     print(f"  ✓ Image {i+1}: Found {len(text_regions)} text regions")
                     all_text_regions.append({
                         'image_path': str(filename),
                         'regions': text_regions,
-                        'source_url': url
+                        'source_url': url,
+                        'shape': shape
                     })
                     downloaded_images.append(str(filename))
                 else:
@@ -183,66 +271,61 @@ class MemeTemplateAnalyzer:
             return []
         
         # Get image dimensions (assuming all images are similar size)
-        first_image = cv2.imread(all_text_regions[0]['image_path'])
-        img_height, img_width = first_image.shape[:2]
-        
-        # Normalize coordinates to percentages for better comparison
-        normalized_regions = []
-        for img_data in all_text_regions:
-            image = cv2.imread(img_data['image_path'])
-            h, w = image.shape[:2]
+        img_height, img_width = all_text_regions[0]['shape']
+        
+        # Normalize coordinates to percentages, stacked as (images, max_regions, 4)
+        # with NaN padding so every comparison below runs as one array operation
+        max_regions = max(len(img_data['regions']) for img_data in all_text_regions)
+        boxes = np.full((len(all_text_regions), max_regions, 4), np.nan)
+        for i, img_data in enumerate(all_text_regions):
+            h, w = img_data['shape']
             
-            normalized = []
-            for region in img_data['regions']:
-                x1, y1, x2, y2 = region['bbox']
-                normalized.append({
-                    'x1_pct': x1 / w,
-                    'y1_pct': y1 / h,
-                    'x2_pct': x2 / w,
-                    'y2_pct': y2 / h,
-                    'text': region['text'],
-                    'confidence': region['confidence']
-                })
-            normalized_regions.append(normalized)
+            if img_data['regions']:
+                bboxes = np.array([region['bbox'] for region in img_data['regions']], dtype=np.float64)
+                boxes[i, :len(bboxes)] = bboxes / [w, h, w, h]
         
         # Group similar regions (simple clustering by position)
         common_regions = []
         position_threshold = 0.15  # 15% difference allowed
+        total_images = len(all_text_regions)
         
         # For each region in the first image, find similar regions in other images
-        if normalized_regions:
-            for base_region in normalized_regions[0]:
-                similar_regions = [base_region]
+        base_regions = boxes[0, :len(all_text_regions[0]['regions'])]
+        other_regions = boxes[1:]
+        
+        # close[b, n, m]: region m of image n+1 starts within the threshold of base region b
+        close = (np.abs(other_regions[None, :, :, :2] - base_regions[:, None, None, :2]) < position_threshold).all(axis=-1)
+        has_match = close.any(axis=-1)
+        first_match = close.argmax(axis=-1)  # First matching region per image, as before
+        
+        for b, base_box in enumerate(base_regions):
+            matched_images = np.nonzero(has_match[b])[0]
+            similar_boxes = np.vstack([base_box, other_regions[matched_images, first_match[b, matched_images]]])
+            
+            # If this region appears in at least 50% of images, consider it common
+            if len(similar_boxes) >= total_images * 0.5:
+                # Calculate average position
+                avg_x1, avg_y1, avg_x2, avg_y2 = (float(v) for v in similar_boxes.mean(axis=0))
                 
-                # Check other images for similar positioned regions
-                for other_img_regions in normalized_regions[1:]:
-                    for region in other_img_regions:
-                        if (abs(region['x1_pct'] - base_region['x1_pct']) < position_threshold and
-                            abs(region['y1_pct'] - base_region['y1_pct']) < position_threshold):
-                            similar_regions.append(region)
-                            break
+                # First 3 examples
+                example_texts = [all_text_regions[0]['regions'][b]['text']] + [
+                    all_text_regions[n + 1]['regions'][first_match[b, n]]['text']
+                    for n in matched_images[:2]
+                ]
                 
-                # If this region appears in at least 50% of images, consider it common
-                if len(similar_regions) >= len(normalized_regions) * 0.5:
-                    # Calculate average position
-                    avg_x1 = sum(r['x1_pct'] for r in similar_regions) / len(similar_regions)
-                    avg_y1 = sum(r['y1_pct'] for r in similar_regions) / len(similar_regions)
-                    avg_x2 = sum(r['x2_pct'] for r in similar_regions) / len(similar_regions)
-                    avg_y2 = sum(r['y2_pct'] for r in similar_regions) / len(similar_regions)
-                    
-                    common_regions.append({
-                        'bbox_percent': [avg_x1, avg_y1, avg_x2, avg_y2],
-                        'bbox_pixel': [
-                            int(avg_x1 * img_width),
-                            int(avg_y1 * img_height),
-                            int(avg_x2 * img_width),
-                            int(avg_y2 * img_height)
-                        ],
-                        'occurrences': len(similar_regions),
-                        'total_images': len(normalized_regions),
-                        'example_texts': [r['text'] for r in similar_regions[:3]],  # First 3 examples
-                        'position_type': self.classify_position(avg_y1)
-                    })
+                common_regions.append({
+                    'bbox_percent': [avg_x1, avg_y1, avg_x2, avg_y2],
+                    'bbox_pixel': [
+                        int(avg_x1 * img_width),
+                        int(avg_y1 * img_height),
+                        int(avg_x2 * img_width),
+                        int(avg_y2 * img_height)
+                    ],
+                    'occurrences': len(similar_boxes),
+                    'total_images': total_images,
+                    'example_texts': example_texts,
+                    'position_type': self.classify_position(avg_y1)
+                })
         
         # Sort by position (top to bottom)
         common_regions.sort(key=lambda r: r['bbox_percent'][1])
@@ -258,11 +341,15 @@ class MemeTemplateAnalyzer:
             return "bottom"
     
     def load_template(self, meme_name):
-        """Load template data from JSON file"""
+        """Load template data, reading the JSON file only on the first request"""
+        if meme_name in self.templates_db:
+            return self.templates_db[meme_name]
         json_path = self.cache_dir / f"{meme_name}_template.json"
         if json_path.exists():
             with open(json_path, 'r') as f:
-                return json.load(f)
+                template_data = json.load(f)
+            self.templates_db[meme_name] = template_data
+            return template_data
         return None
     
     def generate_meme_with_template(self, template_image_path, texts, meme_name):
@@ -297,10 +384,7 @@ class MemeTemplateAnalyzer:
                 font_size = min(region_width // len(text) * 2, region_height // 3, 60)
                 font_size = max(font_size, 20)  # Minimum font size
                 
-                try:
-                    font = ImageFont.truetype("arial.ttf", font_size)
-                except:
-                    font = ImageFont.load_default()
+                font = _load_font(font_size)
                 
                 # Center text in region
                 text_bbox = draw.textbbox((0, 0), text, font=font)
@@ -314,14 +398,9 @@ class MemeTemplateAnalyzer:
                 outline_color = "black"
                 text_color = "white"
                 
-                # Draw outline
-                for dx in [-2, -1, 0, 1, 2]:
-                    for dy in [-2, -1, 0, 1, 2]:
-                        if dx != 0 or dy != 0:
-                            draw.text((x + dx, y + dy), text, font=font, fill=outline_color)
-                
-                # Draw main text
-                draw.text((x, y), text, font=font, fill=text_color)
+                # Draw main text and its outline in a single pass
+                draw.text((x, y), text, font=font, fill=text_color,
+                          stroke_width=2, stroke_fill=outline_color)
         
         # Convert back to OpenCV format
         result_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
@@ -1,8 +1,16 @@
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def download_images(url_file, output_dir):
+# One pooled session so downloads reuse TCP/TLS connections
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=Retry(total=3, backoff_factor=0.3)))
+_SESSION.mount('http://', HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=Retry(total=3, backoff_factor=0.3)))
+
+def download_images(url_file, output_dir, max_workers=32):
     # Ensure output directory exists
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -13,22 +21,33 @@ def download_images(url_file, output_dir):
 
     print(f"Found {len(urls)} URLs to download.")
 
-    for idx, url in enumerate(urls, 1):
-        print(f"Downloading {idx} of {len(urls)}")
+    def fetch(idx, url):
         try:
-            response = requests.get(url, timeout=10)
+            response = _SESSION.get(url, timeout=10)
             response.raise_for_status()
-            # Use the last part of the URL as the filename
-            filename = url.split('/')[-1].split('?')[0]
-            # If filename is empty, use a default
-            if not filename:
-                filename = f"meme_{idx}.jpg"
-            out_path = output_dir / filename
-            with open(out_path, 'wb') as img_file:
-                img_file.write(response.content)
-            print(f"{idx}: Downloaded {url} -> {out_path}")
+            return idx, url, response.content, None
         except Exception as e:
-            print(f"{idx}: Failed to download {url}: {e}")
+            return idx, url, None, e
+
+    # Fetch concurrently; files are written from this thread as results arrive
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for idx, url, content, error in executor.map(fetch, range(1, len(urls) + 1), urls):
+            print(f"Downloading {idx} of {len(urls)}")
+            if error:
+                print(f"{idx}: Failed to download {url}: {error}")
+                continue
+            try:
+                # Use the last part of the URL as the filename
+                filename = url.split('/')[-1].split('?')[0]
+                # If filename is empty, use a default
+                if not filename:
+                    filename = f"meme_{idx}.jpg"
+                out_path = output_dir / filename
+                with open(out_path, 'wb') as img_file:
+                    img_file.write(content)
+                print(f"{idx}: Downloaded {url} -> {out_path}")
+            except Exception as e:
+                print(f"{idx}: Failed to download {url}: {e}")
 
 if __name__ == "__main__":
     url_file = "meme_template_srcs.txt"
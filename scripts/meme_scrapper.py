@@ -1,54 +1,70 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+from concurrent.futures import ThreadPoolExecutor
 import time
 import re
 
-def extract_meme_srcs(max_pages=100):
+# Shared pooled session so page fetches reuse the imgflip connection
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=Retry(total=3, backoff_factor=0.3)))
+
+# Only build the template boxes; the rest of the page is never turned into a tree
+_MEME_BOXES = SoupStrainer('div', class_='mt-box')
+
+def fetch_page(page_num):
+    url = f"https://imgflip.com/memetemplates?page={page_num}"
+    print(f"Scraping page {page_num}...")
+    response = _SESSION.get(url, timeout=30)
+    response.raise_for_status()
+    return response.text
+
+def parse_page(html):
+    soup = BeautifulSoup(html, 'html.parser', parse_only=_MEME_BOXES)
+    
+    # Find all img elements within mt-box divs
+    page_srcs = []
+    for img in soup.select('div.mt-box div.mt-img-wrap img.shadow'):
+        src = img.get('src')
+        if src:
+            # Ensure we have the full URL
+            if src.startswith('//'):
+                src = 'https:' + src
+            page_srcs.append(src)
+    return page_srcs
+
+def extract_meme_srcs(max_pages=100, concurrency=8):
     all_srcs = []
     
-    for page_num in range(1, max_pages + 1):
-        url = f"https://imgflip.com/memetemplates?page={page_num}"
-        print(f"Scraping page {page_num}...")
-        
-        try:
-            response = requests.get(url)
-            response.raise_for_status()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Fetch pages a window at a time, then handle them in page order
+        for window_start in range(1, max_pages + 1, concurrency):
+            page_nums = range(window_start, min(window_start + concurrency, max_pages + 1))
+            futures = [(page_num, executor.submit(fetch_page, page_num)) for page_num in page_nums]
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Find all img elements within mt-box divs
-            meme_boxes = soup.find_all('div', class_='mt-box')
-            
-            page_srcs = []
-            for box in meme_boxes:
-                img_wrap = box.find('div', class_='mt-img-wrap')
-                if img_wrap:
-                    img = img_wrap.find('img', class_='shadow')
-                    if img and img.get('src'):
-                        src = img['src']
-                        # Ensure we have the full URL
-                        if src.startswith('//'):
-                            src = 'https:' + src
-                        page_srcs.append(src)
-            # Print the number of URLs extracted
-            print(f"Extracted {len(page_srcs)} URLs:")
-            for idx, link in enumerate(page_srcs, 1):
-                print(f"{idx}, {link}")
-            
-            # If no sources found on this page, we've likely reached the end
-            if not page_srcs:
-                print(f"No more memes found on page {page_num}. Stopping.")
-                break
+            for page_num, future in futures:
+                try:
+                    page_srcs = parse_page(future.result())
+                except Exception as e:
+                    print(f"Error on page {page_num}: {e}")
+                    return all_srcs
                 
-            all_srcs.extend(page_srcs)
-            print(f"Found {len(page_srcs)} meme templates on page {page_num}")
+                # Print the number of URLs extracted
+                print(f"Extracted {len(page_srcs)} URLs:")
+                for idx, link in enumerate(page_srcs, 1):
+                    print(f"{idx}, {link}")
+                
+                # If no sources found on this page, we've likely reached the end
+                if not page_srcs:
+                    print(f"No more memes found on page {page_num}. Stopping.")
+                    return all_srcs
+                    
+                all_srcs.extend(page_srcs)
+                print(f"Found {len(page_srcs)} meme templates on page {page_num}")
             
-            # Add a short delay to be respectful to the server
+            # Add a short delay between windows to be respectful to the server
             time.sleep(1)
-            
-        except Exception as e:
-            print(f"Error on page {page_num}: {e}")
-            break
     
     return all_srcs
 
@@ -61,4 +77,4 @@ def save_to_file(srcs, filename="meme_template_srcs.txt"):
 
 if __name__ == "__main__":
     srcs = extract_meme_srcs()
-    save_to_file(srcs)
\ No newline at end of file
+    save_to_file(srcs)
@@ -13,33 +13,43 @@
 # get_image_resolution(image_path)
 
 
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
-def draw_text_on_image(image_path, output_path, text_boxes):
+# Load default font once
+try:
+    FONT = ImageFont.truetype("arial.ttf", size=20)
+except:
+    FONT = ImageFont.load_default()
+
+BOX_COLOR = (255, 0, 0)
+BOX_WIDTH = 2
+
+def draw_text_on_image(image_path, output_path, text_boxes, font=FONT):
     # Load image
     image = Image.open(image_path).convert("RGB")
-    draw = ImageDraw.Draw(image)
     
-    # Load default font
-    try:
-        font = ImageFont.truetype("arial.ttf", size=20)
-    except:
-        font = ImageFont.load_default()
+    # Convert bounding boxes to top-left and bottom-right
+    corners = [(int(box[0][0]), int(box[0][1]), int(box[2][0]), int(box[2][1])) for _, box in text_boxes]
+    
+    # Measure every text once (getbbox replaces the removed ImageDraw.textsize)
+    text_bboxes = [font.getbbox(text) for text, _ in text_boxes]
+    
+    # Optional: Draw boxes for visibility, written straight into the pixel array
+    pixels = np.array(image)
+    for x0, y0, x1, y1 in corners:
+        x0, y0 = max(x0, 0), max(y0, 0)
+        pixels[y0:y0 + BOX_WIDTH, x0:x1 + 1] = BOX_COLOR
+        pixels[max(y1 - BOX_WIDTH + 1, 0):y1 + 1, x0:x1 + 1] = BOX_COLOR
+        pixels[y0:y1 + 1, x0:x0 + BOX_WIDTH] = BOX_COLOR
+        pixels[y0:y1 + 1, max(x1 - BOX_WIDTH + 1, 0):x1 + 1] = BOX_COLOR
+    image = Image.fromarray(pixels)
+    draw = ImageDraw.Draw(image)
     
-    for text, box in text_boxes:
-        # Convert bounding box to top-left and bottom-right
-        x0, y0 = box[0]
-        x1, y1 = box[2]
-        
-        # Calculate text size
-        text_width, text_height = draw.textsize(text, font=font)
-        
-        # Center the text
-        x = x0 + (x1 - x0 - text_width) / 2
-        y = y0 + (y1 - y0 - text_height) / 2
-
-        # Optional: Draw box for visibility
-        draw.rectangle([x0, y0, x1, y1], outline="red", width=2)
+    for (text, _), (x0, y0, x1, y1), (left, top, right, bottom) in zip(text_boxes, corners, text_bboxes):
+        # Center the inked text; the bbox offsets place the origin so no second measurement is needed
+        x = x0 + (x1 - x0 - (right - left)) / 2 - left
+        y = y0 + (y1 - y0 - (bottom - top)) / 2 - top
 
         # Draw text
         draw.text((x, y), text, fill="black", font=font)
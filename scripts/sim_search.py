@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Script to search for similar images in the vector database.
-Takes an image file path as input and returns the top 5 similar images with their similarity scores.
+Takes one or more image file paths as input and returns the top 5 similar images for each with their similarity scores.
 """
 
 import argparse
@@ -9,7 +9,12 @@ import os
 import sys
 from pathlib import Path
 import glob
+import hashlib
 import logging
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
 
 # Set up logging
 logging.basicConfig(
@@ -20,16 +25,53 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Add parent directory to path to import ai_services
-script_dir = Path(__file__).resolve().parent
-project_root = script_dir.parent
-sys.path.append(str(project_root))
+from _paths import PROJECT_ROOT as project_root
 
 from ai_services.image_vector_db import ImageVectorDB
 
+# Recent queries keyed by (image digest, k, threshold); each entry keeps the query
+# embedding so near-duplicate images can reuse a result without a new search
+QUERY_CACHE_SIZE = 1024
+SEMANTIC_MATCH_THRESHOLD = 0.98
+_query_cache = OrderedDict()
+cache_stats = {'exact_hits': 0, 'semantic_hits': 0, 'misses': 0}
+
+@lru_cache(maxsize=1)
+def get_db():
+    """Load the vector database and CLIP model once per process"""
+    return ImageVectorDB()
+
+def _file_digest(image_path):
+    with open(image_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def _semantic_lookup(query_emb, k, threshold):
+    """Return cached results for a previous query whose embedding nearly matches"""
+    candidates = [(key, entry) for key, entry in _query_cache.items() if key[1:] == (k, threshold)]
+    if not candidates:
+        return None
+    cached_embs = np.stack([entry[0] for _, entry in candidates])
+    sims = cached_embs @ query_emb
+    best = int(np.argmax(sims))
+    if sims[best] < SEMANTIC_MATCH_THRESHOLD:
+        return None
+    key, (_, results) = candidates[best]
+    _query_cache.move_to_end(key)
+    return results
+
+def _remember(key, query_emb, results):
+    _query_cache[key] = (query_emb, results)
+    _query_cache.move_to_end(key)
+    if len(_query_cache) > QUERY_CACHE_SIZE:
+        _query_cache.popitem(last=False)
+
 def search_similar_images(image_path, k=5, threshold=0.1):
     """
     Search for similar images in the vector database
     
+    Repeated queries for the same image file are answered from an in-memory cache,
+    and so are images whose embedding is nearly identical to a cached query.
+    
     Args:
         image_path: Path to the query image
         k: Number of top results to return
@@ -39,43 +81,125 @@ def search_similar_images(image_path, k=5, threshold=0.1):
         List of (image_path, similarity_score) tuples
     """
     # Initialize the vector database
-    db = ImageVectorDB()
+    db = get_db()
     
     # Get database stats
     stats = db.get_database_stats()
-    logger.info(f"Vector database has {stats['total_images']} images")
+    logger.info("Vector database has %d images", stats['total_images'])
     
     if stats['total_images'] == 0:
         logger.error("Vector database is empty. Run build_vector_db.py first.")
         return []
     
-    # Check if the image exists
-    if not os.path.exists(image_path):
-        logger.error(f"Image file '{image_path}' not found")
+    # Reading the image for its digest doubles as the existence check
+    try:
+        key = (_file_digest(image_path), k, threshold)
+    except FileNotFoundError:
+        logger.error("Image file '%s' not found", image_path)
         return []
+    if key in _query_cache:
+        cache_stats['exact_hits'] += 1
+        _query_cache.move_to_end(key)
+        return _query_cache[key][1]
     
-    # Get the top k similar images
-    results = db.search_top_k(image_path, k=k, threshold=threshold)
+    try:
+        query_emb = db.get_image_embedding(image_path)
+    except Exception as e:
+        logger.error("Error searching for similar images: %s", e)
+        return []
     
+    results = _semantic_lookup(query_emb, k, threshold)
+    if results is not None:
+        cache_stats['semantic_hits'] += 1
+    else:
+        cache_stats['misses'] += 1
+        # Get the top k similar images
+        results = db.search_top_k_by_embedding(query_emb, k=k, threshold=threshold)
+    
+    _remember(key, query_emb, results)
     return results
 
-def format_path_for_display(path, project_root):
-    """Format path for nicer display"""
+def search_similar_images_batch(image_paths, k=5, threshold=0.1):
+    """
+    Search for similar images for several query images at once
+    
+    Cache misses are embedded in a single forward pass and scored with one
+    matrix product instead of one search per image.
+    
+    Args:
+        image_paths: Paths to the query images
+        k: Number of top results to return per image
+        threshold: Minimum similarity score to include
+        
+    Returns:
+        List with one list of (image_path, similarity_score) tuples per query image
+    """
+    db = get_db()
+    
+    stats = db.get_database_stats()
+    logger.info("Vector database has %d images", stats['total_images'])
+    
+    if stats['total_images'] == 0:
+        logger.error("Vector database is empty. Run build_vector_db.py first.")
+        return [[] for _ in image_paths]
+    
+    results = [[] for _ in image_paths]
+    pending = []
+    for i, image_path in enumerate(image_paths):
+        try:
+            key = (_file_digest(image_path), k, threshold)
+        except FileNotFoundError:
+            logger.error("Image file '%s' not found", image_path)
+            continue
+        if key in _query_cache:
+            cache_stats['exact_hits'] += 1
+            _query_cache.move_to_end(key)
+            results[i] = _query_cache[key][1]
+        else:
+            pending.append((i, image_path, key))
+    
+    if not pending:
+        return results
+    
     try:
-        # Try to make path relative to project root
-        rel_path = os.path.relpath(path, str(project_root))
-        # If path is outside project, use full path
-        if rel_path.startswith('..'):
-            return path
-        return rel_path
-    except:
-        # If any error, return original path
-        return path
+        query_embs = db.get_image_embeddings_batch([image_path for _, image_path, _ in pending])
+    except Exception as e:
+        logger.error("Error searching for similar images: %s", e)
+        return results
+    
+    # Near-duplicates of earlier queries reuse their results; the rest share one search
+    to_search = []
+    for (i, _, key), query_emb in zip(pending, query_embs):
+        cached = _semantic_lookup(query_emb, k, threshold)
+        if cached is not None:
+            cache_stats['semantic_hits'] += 1
+            results[i] = cached
+            _remember(key, query_emb, cached)
+        else:
+            cache_stats['misses'] += 1
+            to_search.append((i, key, query_emb))
+    
+    if to_search:
+        batch_results = db.search_top_k_batch(
+            np.stack([query_emb for _, _, query_emb in to_search]), k=k, threshold=threshold
+        )
+        for (i, key, query_emb), image_results in zip(to_search, batch_results):
+            results[i] = image_results
+            _remember(key, query_emb, image_results)
+    
+    return results
+
+# Computed once so display formatting is a prefix check and a slice per result
+PROJECT_ROOT_PREFIX = str(project_root) + os.sep
+
+def format_path_for_display(path, prefix=PROJECT_ROOT_PREFIX):
+    """Format path for nicer display: relative inside the project, full path outside it"""
+    return path[len(prefix):] if path.startswith(prefix) else path
 
 def main():
     # Parse command-line arguments
     parser = argparse.ArgumentParser(description='Search for similar images in the vector database')
-    parser.add_argument('image_path', type=str, help='Path to the query image')
+    parser.add_argument('image_path', type=str, nargs='+', help='Path(s) to the query image(s)')
     parser.add_argument('--k', type=int, default=5, help='Number of top results to return (default: 5)')
     parser.add_argument('--threshold', type=float, default=0.1, help='Minimum similarity score (default: 0.1)')
     parser.add_argument('--stats', action='store_true', help='Display vector database statistics')
@@ -84,7 +208,7 @@ def main():
     
     # If stats flag is provided, just show stats and exit
     if args.stats:
-        db = ImageVectorDB()
+        db = get_db()
         stats = db.get_database_stats()
         print("\nVector Database Statistics:")
         print("-" * 80)
@@ -98,29 +222,45 @@ def main():
         return
     
     # Search for similar images
-    image_path = args.image_path
-    # If relative path is provided, make it absolute
-    if not os.path.isabs(image_path):
-        image_path = os.path.join(os.getcwd(), image_path)
+    # Resolve to absolute paths; one realpath/stat per image also checks that it exists
+    query_paths = []
+    image_paths = []
+    for query_path in args.image_path:
+        try:
+            image_paths.append(Path(query_path).expanduser().resolve(strict=True))
+            query_paths.append(query_path)
+        except FileNotFoundError:
+            print(f"Image file '{query_path}' not found.")
+    
+    if not image_paths:
+        return
     
-    results = search_similar_images(image_path, k=args.k, threshold=args.threshold)
+    if len(image_paths) == 1:
+        all_results = [search_similar_images(image_paths[0], k=args.k, threshold=args.threshold)]
+    else:
+        all_results = search_similar_images_batch(image_paths, k=args.k, threshold=args.threshold)
+    logger.info("Query cache: %(exact_hits)d exact hits, %(semantic_hits)d semantic hits, %(misses)d misses",
+                cache_stats)
     
     # Print the results
-    if results:
-        print(f"\nTop {len(results)} similar images for '{os.path.basename(args.image_path)}':")
-        print("-" * 80)
-        print(f"{'Rank':<6}{'Similarity':<12}{'Image Path'}")
-        print("-" * 80)
-        
-        for i, (image_path, similarity) in enumerate(results, 1):
-            # Format path for display
-            display_path = format_path_for_display(image_path, project_root)
-            print(f"{i:<6}{similarity:.4f}      {display_path}")
+    for query_path, results in zip(query_paths, all_results):
+        if results:
+            print(f"\nTop {len(results)} similar images for '{os.path.basename(query_path)}':")
+            print("-" * 80)
+            print(f"{'Rank':<6}{'Similarity':<12}{'Image Path'}")
+            print("-" * 80)
             
+            for i, (image_path, similarity) in enumerate(results, 1):
+                # Format path for display
+                display_path = format_path_for_display(image_path)
+                print(f"{i:<6}{similarity:.4f}      {display_path}")
+        else:
+            print(f"No similar template images found for {query_path}.")
+    
+    if any(all_results):
         print("\nTo generate a meme with one of these templates:")
         print(f"python -m webapp.app --template data/meme_templates/TEMPLATE_NAME --text \"Your text here\"")
     else:
-        print(f"No similar template images found for {args.image_path}.")
         print("Try running: python scripts/build_vector_db.py")
         print("to build the vector database with your meme templates.")
 
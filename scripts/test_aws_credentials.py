@@ -8,7 +8,7 @@ import json
 from pathlib import Path
 
 # Add parent directory to Python path
-sys.path.append(str(Path(__file__).parent.parent))
+from _paths import PROJECT_ROOT
 
 # Import AWS credential debugging function
 from utils.s3_utils import debug_aws_credentials
@@ -6,9 +6,10 @@ import os
 import sys
 import argparse
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to Python path
-sys.path.append(str(Path(__file__).parent.parent))
+from _paths import PROJECT_ROOT
 
 # Import S3 upload function
 from utils.s3_utils import upload_image_to_s3, debug_aws_credentials
@@ -58,9 +59,20 @@ def main():
     
     print("\n===== S3 Upload Test =====\n")
     
-    # First check credentials
-    print("Checking AWS credentials...")
-    debug_info = debug_aws_credentials()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # Check credentials in the background while the test file is prepared
+        print("Checking AWS credentials...")
+        debug_future = executor.submit(debug_aws_credentials)
+        
+        # Get or create a test file
+        file_path = args.file
+        if not file_path:
+            test_dir = PROJECT_ROOT / "data" / "test"
+            test_dir.mkdir(exist_ok=True, parents=True)
+            test_image_path = test_dir / "test_image.jpg"
+            file_path = create_test_image(test_image_path)
+        
+        debug_info = debug_future.result()
     
     if not debug_info['boto3_session_valid']:
         print("\n❌ AWS credentials are not valid. Running the credentials test...")
@@ -68,14 +80,6 @@ def main():
         test_credentials()
         print("\nContinuing with test upload anyway (will use local fallback)...\n")
     
-    # Get or create a test file
-    file_path = args.file
-    if not file_path:
-        test_dir = Path(__file__).parent.parent / "data" / "test"
-        test_dir.mkdir(exist_ok=True, parents=True)
-        test_image_path = test_dir / "test_image.jpg"
-        file_path = create_test_image(test_image_path)
-    
     print(f"Using file: {file_path}")
     print("Uploading to S3...")
     
@@ -1,63 +1,117 @@
+import os
+import sys
+import json
+import functools
+import hashlib
 import cv2
 import easyocr
 import numpy as np
 
-# Initialize EasyOCR reader
-reader = easyocr.Reader(['en'])  # English language
-
-# Load image
-image_path = '/Users/krishnayadav/Downloads/images (1) (11).jpeg'
-image = cv2.imread(image_path)
-
-if image is None:
-    print("Error: Could not load image. Please check the file path.")
-    exit()
-
-print(f"Image loaded successfully. Shape: {image.shape}")
-
-# Create a copy for drawing bounding boxes
-bbox_image = image.copy()
-
-# Detect text using EasyOCR
-results = reader.readtext(image)
-
-print(f"Number of text regions detected: {len(results)}")
-
-# Draw bounding boxes
-for (bbox, text, confidence) in results:
-    print(f"Detected text: '{text}' with confidence: {confidence:.2f}")
-    
-    # Convert bbox to integer coordinates
-    bbox = np.array(bbox, dtype=np.int32)
-    
-    # Get bounding rectangle
-    x, y, w, h = cv2.boundingRect(bbox)
-    
-    # Draw red rectangle
-    cv2.rectangle(bbox_image, (x, y), (x + w, y + h), (0, 0, 255), 2)
-    
-    # Add text label
-    cv2.putText(bbox_image, f"{text} ({confidence:.2f})", (x, y - 10), 
-                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
-    
-    # Optional: Draw the exact polygon (more precise)
-    cv2.polylines(bbox_image, [bbox], True, (255, 0, 0), 2)
-
-# Display results
-cv2.imshow('Original Image', image)
-cv2.imshow('Text Detection - EasyOCR', bbox_image)
-
-# Wait for window close or key press
-while True:
-    key = cv2.waitKey(1) & 0xFF
-    if (key != 255 or 
-        cv2.getWindowProperty('Original Image', cv2.WND_PROP_VISIBLE) < 1 or
-        cv2.getWindowProperty('Text Detection - EasyOCR', cv2.WND_PROP_VISIBLE) < 1):
-        break
-
-cv2.destroyAllWindows()
-
-# Save result
-output_path = '/Users/krishnayadav/Downloads/easyocr_detection.jpg'
-cv2.imwrite(output_path, bbox_image)
-print(f"Result saved to: {output_path}")
\ No newline at end of file
+@functools.lru_cache(maxsize=1)
+def get_reader():
+    """Initialize the EasyOCR reader on first use and reuse it afterwards"""
+    return easyocr.Reader(['en'])  # English language
+
+OCR_CACHE_FILE = 'ocr_cache.json'
+
+def content_hash(image):
+    """Exact hash of the decoded pixels; only identical images share OCR results"""
+    return hashlib.blake2b(image.tobytes(), digest_size=16).hexdigest()
+
+def detect_text_cached(image, cache_path):
+    """Run EasyOCR, reusing boxes stored in a JSON sidecar for images seen before"""
+    try:
+        with open(cache_path, 'r') as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        cache = {}
+
+    # Pixel bytes alone don't fix the layout, so the image size is part of the key
+    key = f"{content_hash(image)}_{image.shape[1]}x{image.shape[0]}"
+    if key in cache:
+        print("Using cached OCR results.")
+        return [(bbox, text, confidence) for bbox, text, confidence in cache[key]]
+
+    results = get_reader().readtext(image)
+    cache[key] = [(np.asarray(bbox).tolist(), text, float(confidence)) for bbox, text, confidence in results]
+    with open(cache_path, 'w') as f:
+        json.dump(cache, f)
+    return results
+
+def draw_text_boxes(image, results):
+    """Return a copy of image with every EasyOCR detection outlined and labelled"""
+    # Create a copy for drawing bounding boxes
+    bbox_image = image.copy()
+
+    # Stack every polygon into one (N, 4, 2) array and get all bounding rectangles at once
+    polygons = np.array([bbox for bbox, _, _ in results], dtype=np.int32).reshape(-1, 4, 2)
+    top_lefts = polygons.min(axis=1)
+    bottom_rights = polygons.max(axis=1)
+    labels = [f"{text} ({confidence:.2f})" for _, text, confidence in results]
+    if not labels:
+        return bbox_image
+
+    # Draw all red rectangles in one call, as closed 4-point outlines
+    rectangles = np.stack([
+        top_lefts,
+        np.stack([bottom_rights[:, 0], top_lefts[:, 1]], axis=1),
+        bottom_rights,
+        np.stack([top_lefts[:, 0], bottom_rights[:, 1]], axis=1),
+    ], axis=1)
+    cv2.polylines(bbox_image, list(rectangles), True, (0, 0, 255), 2)
+
+    # Optional: Draw the exact polygons (more precise), also in one call
+    cv2.polylines(bbox_image, list(polygons), True, (255, 0, 0), 2)
+
+    # Add text labels; positions differ per box, so these stay one call each
+    for (_, text, confidence), (x, y), label in zip(results, top_lefts, labels):
+        print(f"Detected text: '{text}' with confidence: {confidence:.2f}")
+        cv2.putText(bbox_image, label, (int(x), int(y) - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+
+    return bbox_image
+
+def show_results(image, bbox_image):
+    # Display results (skipped on headless Linux, where there is no display to open)
+    if sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+        print("No display available; skipping preview windows.")
+        return
+
+    cv2.imshow('Original Image', image)
+    cv2.imshow('Text Detection - EasyOCR', bbox_image)
+
+    # Wait for window close or key press, waking every 50 ms instead of every 1 ms
+    while True:
+        key = cv2.waitKey(50) & 0xFF
+        if (key != 255 or
+            cv2.getWindowProperty('Original Image', cv2.WND_PROP_VISIBLE) < 1 or
+            cv2.getWindowProperty('Text Detection - EasyOCR', cv2.WND_PROP_VISIBLE) < 1):
+            break
+
+    cv2.destroyAllWindows()
+
+def main(image_path='/Users/krishnayadav/Downloads/images (1) (11).jpeg',
+         output_path='/Users/krishnayadav/Downloads/easyocr_detection.jpg'):
+    # Load image
+    image = cv2.imread(image_path)
+
+    if image is None:
+        print("Error: Could not load image. Please check the file path.")
+        return
+
+    print(f"Image loaded successfully. Shape: {image.shape}")
+
+    # Detect text using EasyOCR (cached next to the image)
+    results = detect_text_cached(image, os.path.join(os.path.dirname(image_path), OCR_CACHE_FILE))
+
+    print(f"Number of text regions detected: {len(results)}")
+
+    bbox_image = draw_text_boxes(image, results)
+    show_results(image, bbox_image)
+
+    # Save result
+    cv2.imwrite(output_path, bbox_image)
+    print(f"Result saved to: {output_path}")
+
+if __name__ == "__main__":
+    main()
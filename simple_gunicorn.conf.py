@@ -1,10 +1,40 @@
 # Simple Gunicorn configuration for fast startup
+import gc
+import multiprocessing
 import os
+import subprocess
+import sys
+import threading
+
+
+def _cuda_available():
+    # Probe in a child process: importing torch here would initialize CUDA in
+    # the master before the workers are forked
+    try:
+        probe = subprocess.run(
+            [sys.executable, '-c', 'import torch; print(torch.cuda.is_available())'],
+            capture_output=True, text=True, timeout=120
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return probe.stdout.strip() == 'True'
+
+
+CUDA = _cuda_available()
 
 # Basic server settings
 bind = "0.0.0.0:5003"
-workers = 1
-worker_class = "sync"  # Simple sync worker
+# On CPU the models are preloaded in the master and shared copy-on-write, so
+# extra workers are cheap; a GPU box keeps one worker (one CUDA context) and
+# leans on threads instead
+workers = int(os.getenv('GUNICORN_WORKERS', 1 if CUDA else max(2, multiprocessing.cpu_count() // 2)))
+# Threads absorb I/O wait without loading the models again; set to "gevent"
+# (requires the gevent package) to multiplex connections on greenlets instead
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = 8 if CUDA else 4  # gthread only
+# Intra-op threads per worker, split so the workers don't oversubscribe the CPUs
+torch_threads = int(os.getenv('TORCH_NUM_THREADS', max(1, multiprocessing.cpu_count() // workers)))
+worker_connections = 1000  # gevent/eventlet only
 timeout = 300  # 5 minutes timeout
 keepalive = 2
 
@@ -15,4 +45,47 @@ accesslog = "-"  # Log to stdout/stderr
 
 # Process settings
 preload_app = True
-daemon = False 
\ No newline at end of file
+daemon = False 
+
+
+def on_starting(server):
+    # Load the models in the master so forked workers share the weights
+    # copy-on-write. CUDA contexts don't survive fork, so with a GPU each
+    # worker keeps loading its own models on first use.
+    if CUDA:
+        server.log.info("CUDA available, skipping model preload in master")
+        return
+
+    # Only weights are loaded here, single-threaded, so the master never starts
+    # torch's OpenMP/MKL thread pools (they don't survive fork); each worker
+    # restores its own thread count in post_fork
+    import torch
+    torch.set_num_threads(1)
+
+    from bot.routes import warmup_models
+    warmup_models()
+
+
+def pre_fork(server, worker):
+    # Freeze the preloaded app and models so the workers' garbage collector
+    # never touches (and un-shares) their copy-on-write pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if not CUDA:
+        import torch
+        torch.set_num_threads(torch_threads)
+
+    # Build the Twitter notifier and open its API connections in the background
+    # so the worker's first meme request doesn't pay for the handshakes
+    def warm_notifier():
+        try:
+            from bot.twitter_notif import get_notifier
+            notifier = get_notifier()
+            if notifier.openai_client:
+                notifier.openai_client.models.list()
+        except Exception as e:
+            server.log.warning("Twitter notifier warmup failed: %s", e)
+
+    threading.Thread(target=warm_notifier, daemon=True).start()
@@ -49,7 +49,8 @@ def test_twitter_notification():
                 from_template=True,
                 similarity_score=85.5
             )
-            if result:
+            # Posting happens in the background; wait for the returned future
+            if result is not None and result.result():
                 print("✅ Full notification with meme posted successfully!")
             else:
                 print("ℹ️  Full notification was not posted (disabled or failed)")
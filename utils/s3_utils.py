@@ -2,7 +2,9 @@
 S3 utility functions for uploading images to AWS S3.
 """
 import logging
+import functools
 import boto3
+from boto3.s3.transfer import TransferConfig
 import yaml
 import os
 from pathlib import Path
@@ -10,6 +12,15 @@ import uuid
 from botocore.exceptions import ClientError, NoCredentialsError, CredentialRetrievalError
 from dotenv import load_dotenv
 
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# Large files go up as concurrent multipart uploads
+_TRANSFER_CONFIG = TransferConfig(multipart_threshold=8 * 1024 * 1024, max_concurrency=8, use_threads=True)
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -91,10 +102,13 @@ def debug_aws_credentials():
     
     return debug_info
 
+@functools.lru_cache(maxsize=1)
 def load_config():
     """
     Load the configuration from config.yaml and substitute environment variables.
     
+    The file is parsed once per process; later calls return the cached dict.
+    
     Returns:
         dict: Configuration with environment variables substituted
     """
@@ -110,7 +124,7 @@ def load_config():
             yaml_content = yaml_content.replace(placeholder, os.environ[env_var])
     
     # Load the substituted YAML content
-    return yaml.safe_load(yaml_content)
+    return yaml.load(yaml_content, Loader=_YamlLoader)
 
 def get_s3_client():
     """
@@ -210,13 +224,15 @@ def upload_file_to_s3(file_path, content_type=None):
                 file_path, 
                 bucket_name, 
                 object_name,
-                ExtraArgs=extra_args
+                ExtraArgs=extra_args,
+                Config=_TRANSFER_CONFIG
             )
         else:
             s3_client.upload_file(
                 file_path, 
                 bucket_name, 
-                object_name
+                object_name,
+                Config=_TRANSFER_CONFIG
             )
         
         # Generate URL
@@ -5,6 +5,7 @@ import logging
 import requests
 import os
 import time
+import uuid
 from pathlib import Path
 import urllib.parse
 
@@ -30,12 +31,12 @@ def download_image_from_url(url: str) -> str:
             # Extract filename from URL
             parsed_url = urllib.parse.urlparse(url)
             filename = os.path.basename(parsed_url.path)
-            # Ensure filename uniqueness with timestamp prefix
-            timestamp = str(int(time.time()))
+            # Ensure filename uniqueness with timestamp and random prefix
+            timestamp = f"{int(time.time())}_{uuid.uuid4().hex}"
             filename = f"{timestamp}_{filename}"
         else:
             # Use timestamp if URL doesn't have a recognizable image extension
-            timestamp = str(int(time.time()))
+            timestamp = f"{int(time.time())}_{uuid.uuid4().hex}"
             filename = f"{timestamp}.jpg"
         
         # Full path to save the image
@@ -84,13 +84,6 @@ def index():
             
             logger.info(f"Saved original image to {original_path}")
             
-            # Upload to S3 and get URL
-            image_url = upload_image_to_s3(original_path)
-            
-            if not image_url:
-                flash("Failed to upload image. Please try again.", "error")
-                return redirect(url_for('main.index'))
-            
             # Collect text from the form
             top_text = form.top_text.data or ""
             bottom_text = form.bottom_text.data or ""
@@ -104,11 +97,17 @@ def index():
                 api_url = request.host_url.rstrip('/') + get_api_url()
                 
                 payload = {
-                    'image_url': image_url,
                     'caption': caption
                 }
                 
-                response = requests.post(api_url, data=payload, timeout=30)
+                # Send the saved upload directly instead of round-tripping it through S3
+                with open(original_path, 'rb') as image_file:
+                    response = requests.post(
+                        api_url,
+                        data=payload,
+                        files={'image': (unique_filename, image_file)},
+                        timeout=30
+                    )
                 
                 if response.status_code == 200:
                     # Create user_response_meme directory if it doesn't exist